@@ -0,0 +1,66 @@
+# Сравнение задержки и пропускной способности AsyncRingDeque и
+# asyncio.Queue. Запуск из корня репозитория:
+# python -m benchmarks.bench_async_ringqueue
+import asyncio
+import statistics
+import time
+
+from ringqueue import AsyncRingDeque
+
+ITEMS = 100000
+MAXSIZE = 1024
+BATCH = 64
+LATENCY_SAMPLES = 2000
+
+
+async def throughput(queue, batched=False):
+    async def produce():
+        for item in range(ITEMS):
+            await queue.put(item)
+
+    async def consume():
+        received = 0
+        while received < ITEMS:
+            if batched:
+                received += len(await queue.get_batch(BATCH))
+            else:
+                await queue.get()
+                received += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(produce(), consume())
+    return ITEMS / (time.perf_counter() - started)
+
+
+async def latency(queue):
+    # Время от put до получения элемента ожидающим потребителем.
+    samples = []
+
+    async def consume():
+        for _ in range(LATENCY_SAMPLES):
+            sent = await queue.get()
+            samples.append(time.perf_counter() - sent)
+
+    consumer = asyncio.create_task(consume())
+    for _ in range(LATENCY_SAMPLES):
+        await asyncio.sleep(0)
+        await queue.put(time.perf_counter())
+    await consumer
+    return statistics.median(samples) * 1e6
+
+
+async def main():
+    print(f'{"queue":<24}{"items/s":>12}{"median latency, us":>22}')
+    for name, factory, batched in (
+        ('asyncio.Queue', lambda: asyncio.Queue(MAXSIZE), False),
+        ('AsyncRingDeque', lambda: AsyncRingDeque(MAXSIZE), False),
+        ('AsyncRingDeque batches', lambda: AsyncRingDeque(MAXSIZE), True),
+    ):
+        print(
+            f'{name:<24}{await throughput(factory(), batched):>12.0f}'
+            f'{await latency(factory()):>22.2f}'
+        )
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
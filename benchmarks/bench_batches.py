@@ -0,0 +1,60 @@
+# Сравнение пакетных операций RingDeque с поэлементными: popleft_many и
+# pop_many против циклов popleft и pop, windows против срезов list(deque).
+# Запуск из корня репозитория: python -m benchmarks.bench_batches
+import timeit
+
+from ringdeque import RingDeque
+
+SIZE = 100000
+BATCHES = (16, 256, 4096)
+WINDOW = 64
+NUMBER = 20
+
+
+def bench(statement, setup):
+    namespace = {'RingDeque': RingDeque, 'SIZE': SIZE}
+    seconds = timeit.timeit(
+        statement, setup, globals=namespace, number=NUMBER
+    )
+    return seconds / NUMBER * 1e6
+
+
+def main():
+    print(f'{"operation":<36}{"batch":>8}{"batched, us":>14}{"loop, us":>12}')
+    setup = 'deque = RingDeque(range(SIZE), maxlen=SIZE)'
+    for batch in BATCHES:
+        # Забранные элементы сразу возвращаются, чтобы очередь не пустела.
+        for name, batched, loop in (
+            (
+                'popleft_many / popleft',
+                f'deque.extend(deque.popleft_many({batch}))',
+                f'deque.extend([deque.popleft() for _ in range({batch})])',
+            ),
+            (
+                'pop_many / pop',
+                f'deque.extendleft(deque.pop_many({batch}))',
+                f'deque.extendleft([deque.pop() for _ in range({batch})])',
+            ),
+        ):
+            print(
+                f'{name:<36}{batch:>8}{bench(batched, setup):>14.2f}'
+                f'{bench(loop, setup):>12.2f}'
+            )
+    for step in (1, WINDOW // 2, WINDOW):
+        name = f'windows({WINDOW}, {step}), first item'
+        batched = (
+            f'for window in deque.windows({WINDOW}, {step}): window[0]'
+        )
+        loop = (
+            f'items = list(deque)\n'
+            f'for start in range(0, SIZE - {WINDOW} + 1, {step}):\n'
+            f'    items[start:start + {WINDOW}][0]'
+        )
+        print(
+            f'{name:<36}{WINDOW:>8}{bench(batched, setup):>14.2f}'
+            f'{bench(loop, setup):>12.2f}'
+        )
+
+
+if __name__ == '__main__':
+    main()
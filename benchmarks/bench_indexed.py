@@ -0,0 +1,48 @@
+# Стоимость индекса значений IndexedRingDeque: время append и проверки
+# вхождения в сравнении с RingDeque и collections.deque.
+# Запуск из корня репозитория: python -m benchmarks.bench_indexed
+import collections
+import timeit
+
+from ringdeque import IndexedRingDeque, RingDeque
+
+SIZES = (1000, 100000, 1000000)
+APPENDS = 100000
+LOOKUPS = 100
+
+
+def bench(statement, deque, number):
+    seconds = timeit.timeit(
+        statement, globals={'deque': deque}, number=number
+    )
+    return seconds / number * 1e6
+
+
+def main():
+    print(
+        f'{"operation":<24}{"size":>8}{"Indexed, us":>14}'
+        f'{"RingDeque, us":>16}{"deque, us":>12}'
+    )
+    for size in SIZES:
+        # Очереди заполнены, поэтому каждый append вытесняет элемент и
+        # обновляет индекс дважды.
+        deques = (
+            IndexedRingDeque(range(size), maxlen=size),
+            RingDeque(range(size), maxlen=size),
+            collections.deque(range(size), maxlen=size),
+        )
+        for statement, number in (
+            ('deque.append(-1)', APPENDS),
+            (f'{size // 2} in deque', LOOKUPS),
+            ('-2 in deque', LOOKUPS),
+            (f'deque.count({size // 2})', LOOKUPS),
+        ):
+            times = [bench(statement, deque, number) for deque in deques]
+            print(
+                f'{statement:<24}{size:>8}{times[0]:>14.2f}'
+                f'{times[1]:>16.2f}{times[2]:>12.2f}'
+            )
+
+
+if __name__ == '__main__':
+    main()
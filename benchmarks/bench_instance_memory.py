@@ -0,0 +1,52 @@
+# Память на один экземпляр очереди с maxlen=100 для пустых, почти пустых и
+# заполненных очередей в сравнении с collections.deque, а также время
+# создания очереди из списка.
+# Запуск из корня репозитория: python -m benchmarks.bench_instance_memory
+import collections
+import timeit
+import tracemalloc
+
+from ringdeque import RingDeque
+
+MAXLEN = 100
+INSTANCES = 10000
+FILLS = (('empty', 0), ('sparse', 3), ('full', MAXLEN))
+FACTORIES = (
+    ('RingDeque', lambda items: RingDeque(items, maxlen=MAXLEN)),
+    (
+        'RingDeque, growable',
+        lambda items: RingDeque(items, maxlen=MAXLEN, growable=True),
+    ),
+    ('deque', lambda items: collections.deque(items, maxlen=MAXLEN)),
+)
+
+
+def measure(factory, items):
+    # Элементы общие для всех экземпляров, поэтому в замер попадают только
+    # сами очереди и их буферы.
+    tracemalloc.start()
+    rings = [factory(items) for _ in range(INSTANCES)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del rings
+    return size / INSTANCES
+
+
+def main():
+    print(
+        f'{"kind":<22}{"fill":<8}{"bytes":>8}{"create, us":>12}'
+    )
+    for name, factory in FACTORIES:
+        for fill, amount in FILLS:
+            items = list(range(amount))
+            seconds = timeit.timeit(
+                lambda: factory(items), number=INSTANCES
+            )
+            print(
+                f'{name:<22}{fill:<8}{measure(factory, items):>8.0f}'
+                f'{seconds / INSTANCES * 1e6:>12.2f}'
+            )
+
+
+if __name__ == '__main__':
+    main()
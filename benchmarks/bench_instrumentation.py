@@ -0,0 +1,56 @@
+# Стоимость счетчиков ringstats: время операций очереди без счетчиков,
+# после их выключения, со счетчиками и с выборочным замером времени.
+# Запуск из корня репозитория: python -m benchmarks.bench_instrumentation
+import timeit
+
+from ringdeque import RingDeque
+from ringstats import instrument, uninstrument
+
+SIZE = 1000
+NUMBER = 200000
+OPERATIONS = (
+    ('append', 'deque.append(1)'),
+    ('popleft + append', 'deque.append(deque.popleft())'),
+    ('insert + del', 'deque.insert(SIZE // 4, 1); del deque[SIZE // 4]'),
+    ('deque[i]', 'deque[SIZE // 2]'),
+)
+
+
+def plain():
+    return RingDeque(range(SIZE), maxlen=SIZE)
+
+
+def uninstrumented():
+    return uninstrument(instrument(plain()))
+
+
+def instrumented():
+    return instrument(plain())
+
+
+def sampled():
+    return instrument(plain(), hook=lambda name, seconds: None, sample=100)
+
+
+def bench(statement, factory):
+    deque = factory()
+    if statement.startswith('deque.insert'):
+        deque.pop()
+    namespace = {'deque': deque, 'SIZE': SIZE}
+    seconds = timeit.timeit(statement, globals=namespace, number=NUMBER)
+    return seconds / NUMBER * 1e9
+
+
+def main():
+    factories = (plain, uninstrumented, instrumented, sampled)
+    print(f'{"operation, ns":<20}' + ''.join(
+        f'{factory.__name__:>16}' for factory in factories
+    ))
+    for name, statement in OPERATIONS:
+        print(f'{name:<20}' + ''.join(
+            f'{bench(statement, factory):>16.0f}' for factory in factories
+        ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+# Сравнение оконных вычислений над RingDeque и NumpyRingDeque.
+# Требует numpy. Запуск из корня репозитория:
+# python -m benchmarks.bench_numpy_window
+import timeit
+
+import numpy
+
+from ringdeque import NumpyRingDeque, RingDeque
+
+SIZES = (1000, 100000, 1000000)
+NUMBER = 10
+
+
+def bench(statement, deque):
+    seconds = timeit.timeit(
+        statement, globals={'deque': deque, 'numpy': numpy}, number=NUMBER
+    )
+    return seconds / NUMBER * 1e3
+
+
+def main():
+    print(
+        f'{"operation":<16}{"size":>8}{"RingDeque, ms":>16}{"Numpy, ms":>12}'
+    )
+    for size in SIZES:
+        samples = numpy.random.random(size * 3 // 2)
+        ring = RingDeque(samples.tolist(), maxlen=size)
+        array_ring = NumpyRingDeque(samples, maxlen=size, dtype='float64')
+        for name, plain, vectorized in (
+            ('extend', 'deque.extend(numpy.random.random(1000).tolist())',
+             'deque.extend(numpy.random.random(1000))'),
+            ('sum', 'sum(deque)', 'deque.sum()'),
+            ('min/max', '(min(deque), max(deque))',
+             '(deque.min(), deque.max())'),
+            ('percentile', 'numpy.percentile(list(deque), 99)',
+             'deque.percentile(99)'),
+        ):
+            print(
+                f'{name:<16}{size:>8}'
+                f'{bench(plain, ring):>16.3f}'
+                f'{bench(vectorized, array_ring):>12.3f}'
+            )
+
+
+if __name__ == '__main__':
+    main()
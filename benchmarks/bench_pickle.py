@@ -0,0 +1,50 @@
+# Сравнение размера pickle и времени сериализации с восстановлением
+# RingDeque, TypedRingDeque и collections.deque, а также to_bytes и
+# from_bytes TypedRingDeque. Очереди заполнены наполовину, чтобы было видно,
+# что свободные ячейки буфера не сериализуются.
+# Запуск из корня репозитория: python -m benchmarks.bench_pickle
+import collections
+import pickle
+import timeit
+
+from ringdeque import RingDeque, TypedRingDeque
+
+SIZES = (1000, 100000)
+NUMBER = 20
+
+
+def bench(function):
+    return timeit.timeit(function, number=NUMBER) / NUMBER * 1e6
+
+
+def round_trip(deque):
+    return lambda: pickle.loads(pickle.dumps(deque, pickle.HIGHEST_PROTOCOL))
+
+
+def main():
+    print(f'{"container":<36}{"size":>8}{"bytes":>10}{"round trip, us":>16}')
+    for size in SIZES:
+        items = [float(item) for item in range(size // 2)]
+        for name, deque in (
+            ('collections.deque', collections.deque(items, maxlen=size)),
+            ('RingDeque', RingDeque(items, maxlen=size)),
+            (
+                'TypedRingDeque',
+                TypedRingDeque(items, maxlen=size, typecode='d'),
+            ),
+        ):
+            data = pickle.dumps(deque, pickle.HIGHEST_PROTOCOL)
+            print(
+                f'{"pickle " + name:<36}{size:>8}{len(data):>10}'
+                f'{bench(round_trip(deque)):>16.2f}'
+            )
+        deque = TypedRingDeque(items, maxlen=size, typecode='d')
+        seconds = bench(lambda: TypedRingDeque.from_bytes(deque.to_bytes()))
+        print(
+            f'{"TypedRingDeque.to_bytes":<36}{size:>8}'
+            f'{len(deque.to_bytes()):>10}{seconds:>16.2f}'
+        )
+
+
+if __name__ == '__main__':
+    main()
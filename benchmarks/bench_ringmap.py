@@ -0,0 +1,64 @@
+# Сравнение RingDequeMap со словарем RingDeque: память на ключ и время
+# пакетной загрузки пар (ключ, элемент) при разном количестве элементов
+# на ключ.
+# Запуск из корня репозитория: python -m benchmarks.bench_ringmap
+import random
+import time
+import tracemalloc
+
+from ringdeque import RingDeque
+from ringmap import RingDequeMap
+
+KEYS = 20000
+MAXLEN = 100
+PER_KEY = (1, 3, 20, 150)
+
+
+def load_dict(pairs):
+    rings = {}
+    for key, item in pairs:
+        ring = rings.get(key)
+        if ring is None:
+            ring = rings[key] = RingDeque(maxlen=MAXLEN)
+        ring.append(item)
+    return rings
+
+
+def load_map(pairs):
+    rings = RingDequeMap(MAXLEN)
+    rings.extend_many(pairs)
+    return rings
+
+
+def measure(load, pairs):
+    # Ключи и элементы создаются заранее и общие для обоих вариантов,
+    # поэтому в замер памяти попадают только сами кольца.
+    tracemalloc.start()
+    rings = load(pairs)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del rings
+    started = time.perf_counter()
+    load(pairs)
+    return size / KEYS, time.perf_counter() - started
+
+
+def main():
+    print(
+        f'{"per key":>8}{"dict, B/key":>14}{"map, B/key":>13}'
+        f'{"dict, s":>10}{"map, s":>9}'
+    )
+    keys = [f'user-{number}' for number in range(KEYS)]
+    for per_key in PER_KEY:
+        pairs = [(key, 0) for key in keys for _ in range(per_key)]
+        random.shuffle(pairs)
+        dict_bytes, dict_seconds = measure(load_dict, pairs)
+        map_bytes, map_seconds = measure(load_map, pairs)
+        print(
+            f'{per_key:>8}{dict_bytes:>14.0f}{map_bytes:>13.0f}'
+            f'{dict_seconds:>10.2f}{map_seconds:>9.2f}'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+# Сравнение пропускной способности BoundedRingQueue и queue.Queue при
+# разном количестве потоков-производителей и потоков-потребителей.
+# Запуск из корня репозитория: python -m benchmarks.bench_ringqueue
+import queue
+import threading
+import time
+
+from ringqueue import BoundedRingQueue
+
+THREADS = (1, 2, 4, 8, 16)
+ITEMS = 200000
+MAXSIZE = 1024
+BATCH = 64
+
+
+def run(threads, produce, consume):
+    # Каждый производитель кладет свою долю элементов, а потребители
+    # забирают элементы, пока не получат все.
+    per_producer = ITEMS // threads
+    remaining = [per_producer * threads]
+    lock = threading.Lock()
+
+    def consumer():
+        while True:
+            with lock:
+                if remaining[0] <= 0:
+                    return
+            taken = consume()
+            with lock:
+                remaining[0] -= taken
+
+    workers = [
+        threading.Thread(target=produce, args=(per_producer,))
+        for _ in range(threads)
+    ] + [threading.Thread(target=consumer) for _ in range(threads)]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return per_producer * threads / (time.perf_counter() - started)
+
+
+def get_one(source):
+    try:
+        source.get(timeout=0.05)
+    except queue.Empty:
+        return 0
+    return 1
+
+
+def main():
+    print(
+        f'{"threads":>8}{"queue.Queue":>14}{"ring put/get":>14}'
+        f'{"ring batches":>14}  (items/s)'
+    )
+    for threads in THREADS:
+        native = queue.Queue(MAXSIZE)
+
+        def native_produce(amount):
+            for item in range(amount):
+                native.put(item)
+
+        ring = BoundedRingQueue(MAXSIZE)
+
+        def ring_produce(amount):
+            for item in range(amount):
+                ring.put(item)
+
+        batched = BoundedRingQueue(MAXSIZE)
+
+        def batched_produce(amount):
+            for start in range(0, amount, BATCH):
+                batched.put_many(range(start, min(start + BATCH, amount)))
+
+        def batched_consume():
+            try:
+                return len(batched.get_many(BATCH, timeout=0.05))
+            except queue.Empty:
+                return 0
+
+        print(
+            f'{threads:>8}'
+            f'{run(threads, native_produce, lambda: get_one(native)):>14.0f}'
+            f'{run(threads, ring_produce, lambda: get_one(ring)):>14.0f}'
+            f'{run(threads, batched_produce, batched_consume):>14.0f}'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+# Пропускная способность SharedRing и multiprocessing.Queue при передаче
+# записей фиксированного размера между двумя процессами.
+# Запуск из корня репозитория: python -m benchmarks.bench_sharedring
+import multiprocessing
+import queue
+import time
+
+from sharedring import SharedRing
+
+RECORDS = 1000000
+RECORD_SIZE = 64
+BATCH = 256
+SLOTS = 65536
+
+
+def ring_producer(name):
+    with SharedRing(name) as ring:
+        batch = bytes(RECORD_SIZE * BATCH)
+        for _ in range(RECORDS // BATCH):
+            while True:
+                try:
+                    ring.push(batch)
+                except queue.Full:
+                    continue
+                break
+
+
+def queue_producer(records_queue, batched):
+    # Пакет передается одним объектом bytes, как и в SharedRing.push.
+    if batched:
+        batch = bytes(RECORD_SIZE * BATCH)
+        for _ in range(RECORDS // BATCH):
+            records_queue.put(batch)
+    else:
+        record = bytes(RECORD_SIZE)
+        for _ in range(RECORDS):
+            records_queue.put(record)
+
+
+def bench_ring(copy):
+    # Потребитель либо копирует записи через pop, либо работает с ними
+    # прямо в разделяемой памяти через peek и release.
+    ring = SharedRing(slot_size=RECORD_SIZE, slots=SLOTS)
+    producer = multiprocessing.Process(target=ring_producer, args=(ring.name,))
+    started = time.perf_counter()
+    producer.start()
+    received = 0
+    while received < RECORDS // BATCH * BATCH:
+        if copy:
+            received += len(ring.pop()) // RECORD_SIZE
+            continue
+        views = ring.peek()
+        amount = sum(len(view) for view in views) // RECORD_SIZE
+        for view in views:
+            view.release()
+        received += ring.release(amount)
+    elapsed = time.perf_counter() - started
+    producer.join()
+    ring.close()
+    ring.unlink()
+    return received / elapsed
+
+
+def bench_queue(batched):
+    records_queue = multiprocessing.Queue(SLOTS // BATCH if batched else SLOTS)
+    producer = multiprocessing.Process(
+        target=queue_producer, args=(records_queue, batched)
+    )
+    started = time.perf_counter()
+    producer.start()
+    received = 0
+    while received < RECORDS // BATCH * BATCH:
+        item = records_queue.get()
+        received += len(item) // RECORD_SIZE if batched else 1
+    elapsed = time.perf_counter() - started
+    producer.join()
+    return received / elapsed
+
+
+def main():
+    print(f'{"transport":<32}{"records/s":>12}')
+    print(f'{"multiprocessing.Queue":<32}{bench_queue(False):>12.0f}')
+    print(f'{"multiprocessing.Queue batches":<32}{bench_queue(True):>12.0f}')
+    print(f'{"SharedRing pop":<32}{bench_ring(True):>12.0f}')
+    print(f'{"SharedRing peek/release":<32}{bench_ring(False):>12.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+# Сравнение snapshot и copy RingDeque с list(deque) и поэлементной копией,
+# а также стоимости первой записи после снимка, которая копирует буфер.
+# Запуск из корня репозитория: python -m benchmarks.bench_snapshot
+import timeit
+
+from ringdeque import RingDeque
+
+SIZES = (1000, 100000)
+NUMBER = 50
+
+
+def bench(statement, setup, size):
+    namespace = {'RingDeque': RingDeque, 'SIZE': size}
+    seconds = timeit.timeit(
+        statement, setup, globals=namespace, number=NUMBER
+    )
+    return seconds / NUMBER * 1e6
+
+
+def main():
+    print(f'{"operation":<40}{"size":>8}{"time, us":>12}')
+    # Начало очереди сдвинуто, чтобы элементы занимали два участка буфера.
+    setup = (
+        'deque = RingDeque(range(SIZE), maxlen=SIZE)\n'
+        'deque.extend(range(SIZE // 3))'
+    )
+    for size in SIZES:
+        for name, statement in (
+            ('snapshot()', 'deque.snapshot()'),
+            ('snapshot() + append', 'deque.snapshot(); deque.append(0)'),
+            ('snapshot() + rotate(1)', 'deque.snapshot(); deque.rotate(1)'),
+            ('copy()', 'deque.copy()'),
+            ('list(deque)', 'list(deque)'),
+            (
+                'per-element copy',
+                'copy = RingDeque(maxlen=SIZE)\n'
+                'for item in deque: copy.append(item)',
+            ),
+        ):
+            print(f'{name:<40}{size:>8}{bench(statement, setup, size):>12.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,224 @@
+# Сводный набор измерений основных операций RingDeque в сравнении с
+# collections.deque(maxlen=...) и, где операция имеет тот же смысл, со
+# списком. Каждая операция измеряется для емкостей от 10 до 10**6.
+#
+# Запуск из корня репозитория: python -m benchmarks.bench_suite
+#
+# С --json PATH результаты сохраняются в JSON, а с --compare PATH
+# сравниваются с ранее сохраненными. Сравнивается отношение времени
+# RingDeque ко времени collections.deque из того же запуска, поэтому
+# результаты, полученные на другой машине, тоже пригодны для сравнения.
+# Для операций без аналога в deque сравнивается само время. Если
+# отношение выросло больше чем на --threshold, набор завершается с кодом 1.
+import argparse
+import collections
+import json
+import platform
+import sys
+import timeit
+
+from ringdeque import RingDeque
+
+SIZES = tuple(10 ** power for power in range(1, 7))
+# Время, на которое рассчитывается один повтор измерения, в секундах.
+TARGET = 0.02
+REPEAT = 5
+
+# Заполнение очереди перед измерением: полностью или наполовину.
+FULL = 'full'
+HALF = 'half'
+# Сколько раз операцию можно выполнить после одной подготовки очереди:
+# без ограничений, пока очередь не заполнится, пока в ней есть
+# элементы или один раз.
+UNLIMITED = 'unlimited'
+FREE = 'free'
+ITEMS = 'items'
+ONCE = 'once'
+
+RING = 'RingDeque'
+DEQUE = 'deque'
+LIST = 'list'
+MAKERS = {
+    RING: lambda size, fill: RingDeque(range(fill), maxlen=size),
+    DEQUE: lambda size, fill: collections.deque(range(fill), maxlen=size),
+    LIST: lambda size, fill: list(range(fill)),
+}
+ALL = (RING, DEQUE, LIST)
+DEQUES = (RING, DEQUE)
+
+# Название, заполнение, ограничение, выражение, дополнительная подготовка
+# и реализации, для которых операция измеряется. Очередь доступна в
+# выражении как c, ее емкость - как SIZE.
+CASES = (
+    ('append, full', FULL, UNLIMITED, 'c.append(0)', '', DEQUES),
+    ('append, not full', HALF, FREE, 'c.append(0)', '', ALL),
+    ('appendleft, full', FULL, UNLIMITED, 'c.appendleft(0)', '', DEQUES),
+    ('appendleft, not full', HALF, FREE, 'c.appendleft(0)', '', DEQUES),
+    ('pop', FULL, ITEMS, 'c.pop()', '', ALL),
+    ('popleft', FULL, ITEMS, 'c.popleft()', '', DEQUES),
+    (
+        'extend, list', FULL, UNLIMITED, 'c.extend(items)',
+        'items = list(range(SIZE))', DEQUES,
+    ),
+    (
+        'extend, generator', FULL, UNLIMITED,
+        'c.extend(item for item in items)', 'items = list(range(SIZE))',
+        DEQUES,
+    ),
+    ('c[0]', FULL, UNLIMITED, 'c[0]', '', ALL),
+    ('c[SIZE // 2]', FULL, UNLIMITED, 'c[SIZE // 2]', '', ALL),
+    ('c[-1]', FULL, UNLIMITED, 'c[-1]', '', ALL),
+    ('c[0] = 1', FULL, UNLIMITED, 'c[0] = 1', '', ALL),
+    ('iteration', FULL, UNLIMITED, 'for item in c: pass', '', ALL),
+    ('in, last item', FULL, UNLIMITED, 'SIZE - 1 in c', '', ALL),
+    ('insert, head', HALF, FREE, 'c.insert(0, 0)', '', ALL),
+    ('insert, middle', HALF, FREE, 'c.insert(len(c) // 2, 0)', '', ALL),
+    ('insert, tail', HALF, FREE, 'c.insert(len(c), 0)', '', ALL),
+    ('del, head', FULL, ITEMS, 'del c[0]', '', ALL),
+    ('del, middle', FULL, ITEMS, 'del c[len(c) // 2]', '', ALL),
+    ('del, tail', FULL, ITEMS, 'del c[-1]', '', ALL),
+    ('rotate(1), full', FULL, UNLIMITED, 'c.rotate(1)', '', DEQUES),
+    (
+        'rotate(SIZE // 6), not full', HALF, UNLIMITED,
+        'c.rotate(SIZE // 6)', '', DEQUES,
+    ),
+    ('reverse', FULL, UNLIMITED, 'c.reverse()', '', ALL),
+    ('c * 2', FULL, UNLIMITED, 'c * 2', '', ALL),
+    ('c + other', FULL, UNLIMITED, 'c + other', 'other = c.copy()', ALL),
+    ('copy', FULL, UNLIMITED, 'c.copy()', '', ALL),
+    ('clear', FULL, ONCE, 'c.clear()', '', ALL),
+    (
+        'c[SIZE // 4:SIZE // 2]', FULL, UNLIMITED, 'c[SIZE // 4:SIZE // 2]',
+        '', (RING, LIST),
+    ),
+    ('snapshot', FULL, UNLIMITED, 'c.snapshot()', '', (RING,)),
+)
+
+
+def measure(statement, setup, size, fill, limit, kind):
+    # Возвращает наименьшее среди повторов время одной операции в
+    # наносекундах. Количество выполнений в повторе подбирается так, чтобы
+    # повтор занимал около TARGET секунд, но не больше, чем позволяет
+    # подготовленная очередь. Если повтор получается короче, повторов
+    # делается больше.
+    fill = size if fill == FULL else size // 2
+    limit = {
+        UNLIMITED: None, FREE: size - fill, ITEMS: fill, ONCE: 1,
+    }[limit]
+    timer = timeit.Timer(
+        statement, f'c = make(SIZE, {fill})\n{setup}',
+        globals={'make': MAKERS[kind], 'SIZE': size},
+    )
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= TARGET / 10 or number == limit:
+            break
+        number = number * 10 if limit is None else min(number * 10, limit)
+    single = max(elapsed / number, 1e-9)
+    number = max(int(TARGET / single), 1)
+    if limit is not None:
+        number = min(number, limit)
+    repeat = min(max(int(TARGET * REPEAT / (single * number)), REPEAT), 200)
+    return min(timer.repeat(repeat, number)) / number * 1e9
+
+
+def run(sizes, pattern=None):
+    results = []
+    for name, fill, limit, statement, setup, kinds in CASES:
+        if pattern is not None and pattern not in name:
+            continue
+        for size in sizes:
+            row = {}
+            for kind in kinds:
+                row[kind] = measure(statement, setup, size, fill, limit, kind)
+                results.append({
+                    'operation': name, 'size': size, 'implementation': kind,
+                    'ns': round(row[kind], 1),
+                })
+            print(
+                f'{name:<30}{size:>9}' + ''.join(
+                    f'{row[kind]:>14.0f}' if kind in row else f'{"-":>14}'
+                    for kind in ALL
+                ),
+                flush=True,
+            )
+    return results
+
+
+def metrics(results):
+    # Отношение времени RingDeque ко времени deque или, если deque для
+    # операции не измеряется, само время RingDeque.
+    times = {
+        (result['operation'], result['size'], result['implementation']):
+        result['ns'] for result in results
+    }
+    return {
+        (operation, size): (
+            ns / times[operation, size, DEQUE]
+            if (operation, size, DEQUE) in times else ns
+        )
+        for (operation, size, kind), ns in times.items() if kind == RING
+    }
+
+
+def compare(baseline, results, threshold):
+    # Печатает операции, которые стали медленнее больше чем на threshold,
+    # и возвращает их количество.
+    before, after = metrics(baseline), metrics(results)
+    regressions = 0
+    for key in sorted(before.keys() & after.keys()):
+        change = after[key] / before[key] - 1
+        if change > threshold:
+            regressions += 1
+            operation, size = key
+            print(f'regression: {operation}, size {size}: {change:+.0%}')
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks.bench_suite',
+        description='Benchmark RingDeque against collections.deque.',
+    )
+    parser.add_argument(
+        '--sizes', type=int, nargs='+', default=SIZES, metavar='SIZE',
+    )
+    parser.add_argument(
+        '-k', dest='pattern', help='only operations containing PATTERN',
+    )
+    parser.add_argument('--json', metavar='PATH', help='save results')
+    parser.add_argument(
+        '--compare', metavar='PATH', help='compare with saved results',
+    )
+    parser.add_argument(
+        '--threshold', type=float, default=0.25,
+        help='allowed slowdown for --compare (default: 0.25)',
+    )
+    args = parser.parse_args(argv)
+
+    print(f'{"operation, ns":<30}{"size":>9}' + ''.join(
+        f'{kind:>14}' for kind in ALL
+    ))
+    results = run(args.sizes, args.pattern)
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump({
+                'python': platform.python_version(),
+                'implementation': platform.python_implementation(),
+                'machine': platform.machine(),
+                'results': results,
+            }, file, indent=1)
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)['results']
+        regressions = compare(baseline, results, args.threshold)
+        if regressions:
+            print(f'{regressions} regressions above {args.threshold:.0%}')
+            return 1
+        print('no regressions')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
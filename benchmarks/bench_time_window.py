@@ -0,0 +1,65 @@
+# Сравнение TimeWindowRingDeque с ручной обработкой RingDeque: вытеснение
+# старых отметок одним сдвигом против цикла popleft и двоичный поиск
+# since против линейного просмотра.
+# Запуск из корня репозитория: python -m benchmarks.bench_time_window
+import timeit
+
+from ringdeque import RingDeque, TimeWindowRingDeque
+
+SIZES = (1000, 100000, 1000000)
+NUMBER = 20
+
+
+def prune(ring, horizon):
+    while ring and ring[0] < ring[-1] - horizon:
+        ring.popleft()
+
+
+def main():
+    print(
+        f'{"operation":<12}{"size":>8}{"TimeWindow, us":>17}'
+        f'{"RingDeque, us":>16}'
+    )
+    for size in SIZES:
+        # После добавления последней отметки половина остальных
+        # оказывается старше горизонта.
+        timestamps = list(range(size))
+        last = size + size // 2
+        windows = [
+            TimeWindowRingDeque(timestamps, maxlen=size + 1, horizon=size)
+            for _ in range(NUMBER)
+        ]
+        rings = [
+            RingDeque(timestamps, maxlen=size + 1) for _ in range(NUMBER)
+        ]
+
+        def evict_window():
+            windows.pop().append(last)
+
+        def evict_ring():
+            ring = rings.pop()
+            ring.append(last)
+            prune(ring, size)
+
+        window = TimeWindowRingDeque(timestamps, maxlen=size, horizon=size)
+        ring = RingDeque(timestamps, maxlen=size)
+        since = size - 10
+        for operation, timed_window, timed_ring in (
+            ('evict', evict_window, evict_ring),
+            (
+                'since',
+                lambda: window.since(since),
+                lambda: [value for value in ring if value >= since],
+            ),
+        ):
+            times = [
+                timeit.timeit(function, number=NUMBER) / NUMBER * 1e6
+                for function in (timed_window, timed_ring)
+            ]
+            print(
+                f'{operation:<12}{size:>8}{times[0]:>17.2f}{times[1]:>16.2f}'
+            )
+
+
+if __name__ == '__main__':
+    main()
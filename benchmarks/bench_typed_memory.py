@@ -0,0 +1,38 @@
+# Сравнение памяти, занимаемой заполненными RingDeque и TypedRingDeque.
+# Запуск из корня репозитория: python -m benchmarks.bench_typed_memory
+import random
+import tracemalloc
+
+from ringdeque import RingDeque, TypedRingDeque
+
+SIZES = (1000, 100000, 1000000)
+
+
+def measure(factory, values):
+    # Значения создаются заранее, поэтому в замер попадают только объекты,
+    # которыми владеет сама очередь: буфер и хранимые в нем числа.
+    tracemalloc.start()
+    ring = factory(len(values))
+    for value in values:
+        ring.append(value * 1.0)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size
+
+
+def main():
+    print(
+        f'{"size":>8}{"RingDeque, B":>16}{"TypedRingDeque, B":>20}'
+        f'{"ratio":>8}'
+    )
+    for size in SIZES:
+        values = [random.random() for _ in range(size)]
+        plain = measure(lambda maxlen: RingDeque(maxlen=maxlen), values)
+        typed = measure(
+            lambda maxlen: TypedRingDeque(maxlen=maxlen, typecode='d'), values
+        )
+        print(f'{size:>8}{plain:>16}{typed:>20}{plain / typed:>8.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,64 +1,368 @@
+import array
+import collections
+import operator
+import pickle
+import struct
+import sys
 import typing
 import itertools
+import zlib
+
+
+# Наименьшая ненулевая емкость буфера растущей очереди.
+_MIN_CAPACITY = 4
+
+# Заголовок to_bytes: код типа элементов, признак растущей очереди и
+# максимальная длина. За ним следуют элементы в логическом порядке с
+# порядком байтов little-endian.
+_BYTES_HEADER = struct.Struct('<8s?Q')
+
+
+def _restore(cls, items, options):
+    # Восстанавливает очередь при распаковке pickle.
+    return cls(items, **options)
 
 
 class RingDeque(typing.MutableSequence):
+    # Атрибуты хранятся в слотах, а не в __dict__, чтобы очередь занимала
+    # меньше памяти, когда очередей очень много. Слот _stats заполняется
+    # только у очередей, для которых ringstats.instrument включил счетчики.
+    __slots__ = (
+        '_maxlen', '_growable', '_buffer', '_start_index', '_items_amount',
+        '_state', '_shared', '_stats',
+    )
+    # Значение, которым заполняются свободные ячейки буфера.
+    _empty = None
 
-    def __init__(self, iterable=None, *, maxlen):
+    # Буфер выделяется при первой записи. Емкость буфера обычной очереди
+    # после этого равна maxlen. Растущая очередь (growable=True) удваивает
+    # буфер при заполнении, пока он не достигнет maxlen, и вдвое уменьшает,
+    # когда занято не больше четверти ячеек. Поэтому позиции в буфере везде
+    # считаются по модулю len(self._buffer), а не maxlen.
+    def __init__(self, iterable=None, *, maxlen, growable=False):
+        # Буфер выделяется только при первой записи, поэтому тип maxlen
+        # проверяется сразу.
+        maxlen = operator.index(maxlen)
         if maxlen < 0:
             raise ValueError('maxlen must be non-negative')
-        self._buffer = [None for _ in range(maxlen)]
+        self._maxlen = maxlen
+        self._growable = growable
+        self._buffer = self._allocate(0)
+        # Признак того, что буфер используется снимком. Перед первой
+        # записью в такой буфер очередь заменяет его своей копией.
+        self._shared = False
         self._start_index = 0
         self._items_amount = 0
-        if iterable:
+        # Счетчик структурных изменений очереди. Используется итераторами
+        # для обнаружения изменения очереди во время итерации.
+        self._state = 0
+        if iterable is not None:
             self.extend(iterable)
 
     @property
     def maxlen(self):
-        return len(self._buffer)
+        return self._maxlen
+
+    @property
+    def growable(self):
+        return self._growable
 
     def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self._get_slice(index)
         if not -len(self) <= index < len(self):
             raise IndexError('deque index out of range')
         # Выбираем правильный положительный индекс в зависимости
         # от знака переданного индекса.
         index = index if index >= 0 else len(self) + index
-        return self._buffer[(self._start_index + index) % self.maxlen]
+        return self._buffer[(self._start_index + index) % len(self._buffer)]
 
     def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            return self._set_slice(index, value)
         if not -len(self) <= index < len(self):
             raise IndexError('deque index out of range')
         # Выбираем правильный положительный индекс в зависимости
         # от знака переданного индекса.
         index = index if index >= 0 else len(self) + index
-        self._buffer[(self._start_index + index) % self.maxlen] = value
+        if self._shared:
+            self._own()
+        self._buffer[(self._start_index + index) % len(self._buffer)] = value
 
     def __delitem__(self, index):
+        if isinstance(index, slice):
+            return self._del_slice(index)
         if not -len(self) <= index < len(self):
             raise IndexError('deque index out of range')
         # Выбираем правильный положительный индекс в зависимости
         # от знака переданного индекса.
         index = index if index >= 0 else len(self) + index
         # Для удаления нужного элемента, переставляем все стоящие от него
-        # справа или слева элементы на 1 ячейку. Направление перестановки
-        # выбирается в зависимости от того, в какой половине находится
-        # удаляемый элемент. В ячейку, из которой был взят последний
-        # переставленный элемент, записываем None для предотвращения
-        # утечки памяти.
-        if index > len(self) // 2:
-            for i in range(index, len(self) - 1):
-                self[i] = self[i + 1]
-            self[-1] = None
-        else:
-            for i in reversed(range(1, index + 1)):
-                self[i] = self[i - 1]
-            self[0] = None
-            self._start_index = (self._start_index + 1) % self.maxlen
-        self._items_amount -= 1
+        # справа или слева элементы на 1 ячейку одним блочным копированием.
+        # Направление перестановки выбирается в зависимости от того, с какой
+        # стороны от удаляемого элемента меньше элементов.
+        self._close_gap(index, 1)
 
     def __len__(self):
         return self._items_amount
 
+    def __iter__(self):
+        state = self._state
+        for start, stop in self._segments():
+            for i in range(start, stop):
+                if self._state != state:
+                    raise RuntimeError('deque mutated during iteration')
+                # Буфер читается через self: после snapshot() запись
+                # заменяет буфер копией, не меняя счетчик изменений.
+                yield self._buffer[i]
+
+    def __reversed__(self):
+        state = self._state
+        for start, stop in reversed(self._segments()):
+            for i in range(stop - 1, start - 1, -1):
+                if self._state != state:
+                    raise RuntimeError('deque mutated during iteration')
+                # Буфер читается через self: после snapshot() запись
+                # заменяет буфер копией, не меняя счетчик изменений.
+                yield self._buffer[i]
+
+    def _segments(self, start=0, stop=None):
+        # Живые элементы с логическими индексами [start, stop) занимают
+        # в буфере не более двух непрерывных участков: до конца буфера и,
+        # если очередь "переходит" через конец буфера, от его начала.
+        stop = len(self) if stop is None else stop
+        capacity = len(self._buffer)
+        begin = self._start_index + start
+        end = self._start_index + stop
+        if begin >= capacity:
+            begin -= capacity
+            end -= capacity
+        if end <= capacity:
+            return (begin, end), (0, 0)
+        return (begin, capacity), (0, end - capacity)
+
+    def _allocate(self, size):
+        return [self._empty] * size
+
+    def _new(self, iterable=None):
+        # Создает пустую очередь того же вида и максимальной длины.
+        return RingDeque(iterable, maxlen=self.maxlen, growable=self.growable)
+
+    def _position(self, index):
+        return (self._start_index + index) % len(self._buffer)
+
+    def _reallocate(self, capacity, start=0):
+        # Переносит элементы с логическими индексами от start до конца
+        # очереди в новый буфер емкости capacity, начиная с его первой
+        # ячейки. Старый буфер освобождается целиком.
+        items = self._read(start, len(self)) if self else ()
+        self._buffer = self._allocate(capacity)
+        self._shared = False
+        if items:
+            self._write(0, items)
+        self._start_index = 0
+        self._items_amount = len(items)
+        self._state += 1
+
+    def _reserve(self, amount):
+        # Увеличивает буфер так, чтобы в нем поместилось amount элементов,
+        # но не больше maxlen. Буфер обычной очереди сразу выделяется
+        # целиком, а буфер растущей растет не меньше чем вдвое, поэтому
+        # добавление остается амортизированным O(1).
+        capacity = len(self._buffer)
+        if amount > capacity < self.maxlen:
+            if not self._growable:
+                self._reallocate(self.maxlen)
+                return
+            self._reallocate(min(
+                max(amount, 2 * capacity, _MIN_CAPACITY), self.maxlen
+            ))
+
+    def _release(self):
+        # Уменьшает вдвое буфер растущей очереди, занятый не больше чем на
+        # четверть. После уменьшения буфер заполнен наполовину, поэтому
+        # чередование добавлений и удалений не вызывает частых копирований.
+        capacity = len(self._buffer)
+        if self._growable and capacity > _MIN_CAPACITY \
+                and len(self) * 4 <= capacity:
+            self._reallocate(max(capacity // 2, _MIN_CAPACITY))
+
+    def resize(self, maxlen):
+        # Меняет максимальную длину очереди на месте, перенося элементы в
+        # новый буфер одним копированием. При уменьшении остаются последние
+        # maxlen элементов, как при вытеснении.
+        maxlen = operator.index(maxlen)
+        if maxlen < 0:
+            raise ValueError('maxlen must be non-negative')
+        # Невыделенный буфер остается невыделенным.
+        capacity = maxlen if len(self._buffer) else 0
+        if self._growable:
+            capacity = min(max(len(self._buffer), len(self)), maxlen)
+        self._reallocate(capacity, max(len(self) - maxlen, 0))
+        self._maxlen = maxlen
+
+    def _read(self, start, stop):
+        # Возвращает список элементов с логическими индексами [start, stop),
+        # собранный не более чем из двух срезов буфера.
+        (a, b), (c, d) = self._segments(start, stop)
+        return self._buffer[a:b] + self._buffer[c:d]
+
+    def _write(self, position, items):
+        # Записывает items в буфер, начиная с позиции position, не более
+        # чем двумя срезами: до конца буфера и с его начала.
+        if self._shared:
+            self._own()
+        # Пустой срез не записывается: array.array не позволяет даже
+        # пустое присваивание срезу, пока на буфер есть memoryview.
+        if not len(items):
+            return
+        first = min(len(items), len(self._buffer) - position)
+        if first == len(items):
+            # Элементы помещаются до конца буфера и записываются без
+            # промежуточной копии среза.
+            self._buffer[position:position + first] = items
+            return
+        self._buffer[position:position + first] = items[:first]
+        self._buffer[:len(items) - first] = items[first:]
+
+    def _open_gap(self, index, n):
+        # Освобождает n ячеек перед элементом с индексом index. Как и при
+        # вставке одного элемента, сдвигается меньшая из двух частей
+        # очереди, причем целиком, двумя срезами. Значения в освободившихся
+        # ячейках не определены и должны быть перезаписаны вызывающим.
+        self._reserve(len(self) + n)
+        self._state += 1
+        # Начало и количество элементов меняются только после успешной
+        # записи, чтобы ошибка записи не испортила очередь.
+        if index < len(self) - index:
+            items = self._read(0, index)
+            start = (self._start_index - n) % len(self._buffer)
+            self._write(start, items)
+            self._start_index = start
+            self._items_amount += n
+        else:
+            items = self._read(index, len(self))
+            self._write(self._position(index + n), items)
+            self._items_amount += n
+
+    def _close_gap(self, index, n):
+        # Удаляет n элементов, начиная с индекса index, сдвигая меньшую из
+        # оставшихся частей очереди. Освободившиеся ячейки заполняются пустым
+        # значением для предотвращения утечки памяти.
+        self._state += 1
+        if index < len(self) - index - n:
+            items = self._read(0, index)
+            self._write(self._position(n), items)
+            self._write(self._start_index, [self._empty] * n)
+            self._start_index = (self._start_index + n) % len(self._buffer)
+        else:
+            items = self._read(index + n, len(self))
+            self._write(self._position(index), items)
+            self._write(self._position(len(self) - n), [self._empty] * n)
+        self._items_amount -= n
+        self._release()
+
+    def _get_slice(self, index):
+        indices = range(*index.indices(len(self)))
+        if not indices:
+            return self._new()
+        # Читаем непрерывный участок, покрывающий все нужные элементы,
+        # и уже из него выбираем элементы с нужным шагом.
+        low, high = min(indices[0], indices[-1]), max(indices[0], indices[-1])
+        items = self._read(low, high + 1)
+        if indices.step != 1:
+            items = items[indices[0] - low::indices.step]
+        return self._new(items)
+
+    def _set_slice(self, index, value):
+        indices = range(*index.indices(len(self)))
+        items = list(value)
+        if indices.step != 1:
+            if len(items) != len(indices):
+                raise ValueError(
+                    f'attempt to assign sequence of size {len(items)} '
+                    f'to extended slice of size {len(indices)}'
+                )
+            if not indices:
+                return
+            if indices.step < 0:
+                indices = indices[::-1]
+                items.reverse()
+            low, high = indices[0], indices[-1] + 1
+            if indices.step != 1:
+                span = self._read(low, high)
+                span[::indices.step] = items
+                items = span
+            self._write(self._position(low), items)
+            return
+        # Присваивание непрерывному срезу может изменить длину очереди.
+        # Разница в количестве элементов закрывается или открывается одним
+        # сдвигом, после чего новые значения записываются на место среза.
+        difference = len(items) - len(indices)
+        if len(self) + difference > self.maxlen:
+            raise IndexError('deque already at its maximum size')
+        if difference < 0:
+            self._close_gap(indices.start + len(items), -difference)
+        elif difference > 0:
+            self._open_gap(indices.start + len(indices), difference)
+        if items:
+            self._write(self._position(indices.start), items)
+
+    def _del_slice(self, index):
+        indices = range(*index.indices(len(self)))
+        if not indices:
+            return
+        if indices.step < 0:
+            indices = indices[::-1]
+        if indices.step == 1:
+            self._close_gap(indices[0], len(indices))
+            return
+        # Для среза с шагом удаляем элементы из участка от первого
+        # удаляемого элемента до конца очереди и записываем его обратно,
+        # заполняя освободившиеся ячейки в конце пустым значением.
+        self._state += 1
+        low = indices[0]
+        span = self._read(low, len(self))
+        del span[:indices[-1] - low + 1:indices.step]
+        self._write(self._position(low), span + [self._empty] * len(indices))
+        self._items_amount -= len(indices)
+        self._release()
+
+    def _repeat(self, n):
+        # Возвращает последние maxlen элементов последовательности из n
+        # копий очереди. Они начинаются со смещения offset внутри одной из
+        # копий и занимают не более maxlen // len(self) + 2 копий подряд,
+        # поэтому результат собирается без построения всех n копий.
+        if n <= 0 or not self:
+            return []
+        amount = min(n * len(self), self.maxlen)
+        offset = -amount % len(self)
+        copies = -(-(amount + offset) // len(self))
+        return (self._read(0, len(self)) * copies)[offset:offset + amount]
+
+    def _tail(self, iterable):
+        # Возвращает список из последних maxlen элементов iterable. Все
+        # остальные элементы все равно были бы вытеснены из очереди, поэтому
+        # у последовательностей они пропускаются без обхода, а у остальных
+        # итерируемых объектов отбрасываются ограниченным буфером.
+        if isinstance(iterable, list):
+            return iterable[-self.maxlen:]
+        if isinstance(iterable, (tuple, array.array)):
+            return list(iterable[-self.maxlen:])
+        if isinstance(iterable, RingDeque):
+            return iterable._read(
+                max(len(iterable) - self.maxlen, 0), len(iterable)
+            )
+        if isinstance(iterable, typing.Sequence):
+            skip = max(len(iterable) - self.maxlen, 0)
+            return [iterable[index] for index in range(skip, len(iterable))]
+        # Остальные объекты с длиной нельзя индексировать, поэтому
+        # пропускаемые элементы приходится обходить.
+        if isinstance(iterable, typing.Sized):
+            skip = max(len(iterable) - self.maxlen, 0)
+            return list(itertools.islice(iterable, skip, None))
+        return list(collections.deque(iterable, maxlen=self.maxlen))
+
     def __eq__(self, other):
         return isinstance(other, RingDeque) and len(self) == len(other) and \
                all((a == b for a, b in zip(self, other)))
@@ -67,67 +371,174 @@ class RingDeque(typing.MutableSequence):
     def __add__(self, other):
         if not isinstance(other, RingDeque):
             return NotImplemented
-        return RingDeque(itertools.chain(self, other), maxlen=self.maxlen)
+        # В результат попадают только последние maxlen элементов, поэтому
+        # из каждого операнда читается лишь та часть, которая в них войдет.
+        right = other._read(max(len(other) - self.maxlen, 0), len(other))
+        left_amount = min(len(self), self.maxlen - len(right))
+        left = self._read(len(self) - left_amount, len(self))
+        return self._new(left + right)
 
     def __iadd__(self, other):
         if not isinstance(other, typing.Iterable):
             return NotImplemented
-        self.extend(list(other))
+        self.extend(other)
         return self
 
     def __mul__(self, n):
         if not isinstance(n, int):
             return NotImplemented
-        multiplied_deque = RingDeque([], maxlen=self.maxlen)
-        if n <= 0:
-            return multiplied_deque
-        for _ in range(n):
-            multiplied_deque.extend(list(self))
-        return multiplied_deque
+        return self._new(self._repeat(n))
 
     def __imul__(self, n):
         if not isinstance(n, int):
             return NotImplemented
-        if n <= 0:
-            return RingDeque([], maxlen=self.maxlen)
-        for _ in range(n - 1):
-            self.extend(list(self))
+        items = self._repeat(n)
+        self.clear()
+        self.extend(items)
         return self
 
     def __rmul__(self, n):
         return self * n
 
     def __copy__(self):
-        return RingDeque(self, maxlen=self.maxlen)
+        # Копия получает копию буфера, сделанную срезом, и те же начало и
+        # количество элементов, без повторного добавления элементов.
+        copy = self._new()
+        copy._buffer = self._copy_buffer()
+        copy._start_index = self._start_index
+        copy._items_amount = self._items_amount
+        return copy
+
+    def _copy_buffer(self):
+        return self._buffer[:]
+
+    def _options(self):
+        # Параметры конструктора очереди, кроме элементов.
+        return {'maxlen': self.maxlen, 'growable': self.growable}
+
+    def _dump(self):
+        # Элементы очереди в логическом порядке для сериализации.
+        return self._read(0, len(self))
+
+    def __reduce__(self):
+        # В pickle попадают только элементы в логическом порядке и
+        # параметры конструктора, без свободных ячеек буфера, положения
+        # начала и признака общего со снимком буфера. При распаковке
+        # элементы записываются в пустую очередь одним _fill.
+        return _restore, (type(self), self._dump(), self._options())
+
+    def _own(self):
+        # Заменяет буфер, используемый снимком, его копией перед первой
+        # записью после создания снимка.
+        self._buffer = self._copy_buffer()
+        self._shared = False
+
+    def snapshot(self):
+        # Возвращает неизменяемый снимок текущего содержимого очереди за
+        # O(1). Снимок ссылается на текущий буфер, а очередь копирует буфер
+        # перед первой записью после создания снимка. Изменения очереди,
+        # которые не пишут в буфер, например rotate заполненной очереди,
+        # обходятся без копирования.
+        self._shared = True
+        return RingDequeSnapshot(
+            self._buffer, self._start_index, self._items_amount
+        )
 
     def __repr__(self):
         items = list(self)
-        return f'RingDeque({items}, maxlen={self.maxlen})'
+        return f'{type(self).__name__}({items}, maxlen={self.maxlen})'
 
     def append(self, item):
         # В случае нулевой длины очереди, никакие элементы не могут
         # быть добавлены.
         if self.maxlen == 0:
             return
+        if len(self) == len(self._buffer) < self.maxlen:
+            self._reserve(len(self) + 1)
+        if self._shared:
+            self._own()
+        # Элемент записывается до изменения счетчиков, чтобы неудачная
+        # запись не оставила очередь в несогласованном состоянии. При
+        # заполненном буфере позиция записи совпадает с началом очереди.
+        self._buffer[self._position(len(self))] = item
+        self._state += 1
         if len(self) < self.maxlen:
             self._items_amount += 1
         else:
-            self._start_index = (self._start_index + 1) % self.maxlen
-        self[-1] = item
+            self._start_index = (self._start_index + 1) % len(self._buffer)
 
     def appendleft(self, item):
         # В случае нулевой длины очереди, никакие элементы не могут
         # быть добавлены.
         if self.maxlen == 0:
             return
+        if len(self) == len(self._buffer) < self.maxlen:
+            self._reserve(len(self) + 1)
+        if self._shared:
+            self._own()
+        position = (self._start_index - 1) % len(self._buffer)
+        self._buffer[position] = item
+        self._state += 1
         if len(self) < self.maxlen:
             self._items_amount += 1
-        self._start_index = (self._start_index - 1) % self.maxlen
-        self[0] = item
+        self._start_index = position
+
+    def extend(self, iterable):
+        if self.maxlen == 0:
+            return
+        items = self._tail(iterable)
+        if len(items) == 0:
+            return
+        if not self._items_amount:
+            self._fill(items)
+            return
+        self._reserve(len(self) + len(items))
+        # Новые элементы записываются сразу за последним элементом очереди.
+        # При переполнении они затирают самые старые элементы, поэтому
+        # начало очереди сдвигается на количество вытесненных элементов.
+        self._write(self._position(len(self)), items)
+        self._state += 1
+        overflow = len(self) + len(items) - self.maxlen
+        if overflow > 0:
+            self._start_index = (
+                (self._start_index + overflow) % len(self._buffer)
+            )
+            self._items_amount = self.maxlen
+        else:
+            self._items_amount += len(items)
+
+    def _fill(self, items):
+        # Заполняет пустую очередь, например при создании из списка: буфер
+        # выделяется сразу нужной емкости, а элементы записываются с его
+        # первой ячейки без вычисления позиций и вытеснения.
+        if len(self._buffer) < len(items):
+            self._buffer = self._allocate(
+                self.maxlen if not self._growable
+                else min(max(len(items), _MIN_CAPACITY), self.maxlen)
+            )
+            self._shared = False
+        self._write(0, items)
+        self._state += 1
+        self._start_index = 0
+        self._items_amount = len(items)
 
     def extendleft(self, iterable):
-        for i in iterable:
-            self.appendleft(i)
+        if self.maxlen == 0:
+            return
+        items = self._tail(iterable)
+        if len(items) == 0:
+            return
+        # Элементы добавляются слева по одному, поэтому в очереди они
+        # оказываются в обратном порядке. При переполнении вытесняются
+        # элементы с правого конца, то есть начало очереди просто
+        # сдвигается влево на количество новых элементов.
+        self._reserve(len(self) + len(items))
+        items = items[::-1]
+        position = (self._start_index - len(items)) % len(self._buffer)
+        self._write(position, items)
+        self._state += 1
+        self._start_index = position
+        self._items_amount = min(len(self) + len(items), self.maxlen)
 
     def copy(self):
         return self.__copy__()
@@ -147,36 +558,1286 @@ class RingDeque(typing.MutableSequence):
         # При вставке в правую часть, все элементы справа смещаются вправо.
         # При вставке в левую часть, все элементы слева смещаются влево.
         # Это сделано для того, чтобы производить меньше смещений элементов в
-        # общем случае.
-        if index > len(self) // 2:
-            self.append(None)
-            for i in reversed(range(index + 1, len(self))):
-                self[i] = self[i - 1]
-        else:
-            self.appendleft(None)
-            for i in range(0, index + 1):
-                self[i] = self[i + 1]
-        self[index] = item
+        # общем случае. Смещение выполняется срезами буфера.
+        self._open_gap(index, 1)
+        self._buffer[self._position(index)] = item
+
+    def index(self, value, start=0, stop=None):
+        start, stop, _ = slice(start, stop).indices(len(self))
+        stop = max(start, stop)
+        # Поиск ведется встроенным list.index по каждому из двух участков
+        # буфера, без обращения к __getitem__ для каждого элемента.
+        offset = start
+        for segment_start, segment_stop in self._segments(start, stop):
+            try:
+                position = self._buffer.index(
+                    value, segment_start, segment_stop
+                )
+            except ValueError:
+                offset += segment_stop - segment_start
+            else:
+                return offset + position - segment_start
+        raise ValueError(f'{value!r} is not in deque')
+
+    def remove(self, value):
+        del self[self.index(value)]
+
+    def pop(self, index=-1):
+        if index == 0:
+            return self.popleft()
+        if index != -1:
+            item = self[index]
+            del self[index]
+            return item
+        if not self:
+            raise IndexError('pop from an empty deque')
+        if self._shared:
+            self._own()
+        self._state += 1
+        position = self._position(len(self) - 1)
+        item = self._buffer[position]
+        self._buffer[position] = self._empty
+        self._items_amount -= 1
+        self._release()
+        return item
 
     def popleft(self):
-        return self.pop(0)
+        if not self:
+            raise IndexError('pop from an empty deque')
+        if self._shared:
+            self._own()
+        self._state += 1
+        item = self._buffer[self._start_index]
+        self._buffer[self._start_index] = self._empty
+        self._start_index = (self._start_index + 1) % len(self._buffer)
+        self._items_amount -= 1
+        self._release()
+        return item
+
+    def popleft_many(self, n):
+        # Удаляет и возвращает список из не более чем n первых элементов в
+        # том порядке, в котором их вернули бы вызовы popleft. Элементы
+        # читаются не более чем двумя срезами, а начало очереди сдвигается
+        # один раз.
+        if n < 0:
+            raise ValueError('n must be non-negative')
+        items = self._read(0, min(n, len(self)))
+        if items:
+            self._close_gap(0, len(items))
+        return items
+
+    def pop_many(self, n):
+        # Удаляет и возвращает список из не более чем n последних элементов
+        # в том порядке, в котором их вернули бы вызовы pop.
+        if n < 0:
+            raise ValueError('n must be non-negative')
+        amount = min(n, len(self))
+        items = self._read(len(self) - amount, len(self))
+        if items:
+            self._close_gap(len(self) - amount, amount)
+        items.reverse()
+        return items
+
+    def windows(self, size, step=1):
+        # Возвращает итератор по окнам из size подряд идущих элементов,
+        # начала которых отстоят друг от друга на step. Окна - это
+        # представления RingDequeView, которые не копируют элементы, пока
+        # к ним не обратились.
+        if size <= 0 or step <= 0:
+            raise ValueError('size and step must be positive')
+        return self._windows(size, step)
+
+    def _windows(self, size, step):
+        state = self._state
+        for start in range(0, len(self) - size + 1, step):
+            if self._state != state:
+                raise RuntimeError('deque mutated during iteration')
+            yield RingDequeView(self, start, start + size)
+
+    def clear(self):
+        # Затираем только занятые ячейки буфера, чтобы освободить ссылки на
+        # хранимые объекты, не пересоздавая сам буфер. Растущая очередь
+        # освобождает буфер целиком, а очередь, буфер которой используется
+        # снимком, просто заменяет его новым.
+        if self._growable or self._shared:
+            self._reallocate(
+                0 if self._growable else len(self._buffer), len(self)
+            )
+            return
+        self._state += 1
+        for start, stop in self._segments():
+            self._write(start, [self._empty] * (stop - start))
+        self._start_index = 0
+        self._items_amount = 0
 
     def rotate(self, n=1):
-        # В случае нулевой длины очереди, вращать ее не получится.
-        if self.maxlen == 0:
+        # В случае пустой очереди, вращать ее не получится.
+        if not self:
             return
         # Нормализуем n для случаев, когда abs(n) > len(self).
         n = n % len(self)
+        if n == 0:
+            return
+        self._state += 1
         # При полностью заполненом буфере достаточно изменить
         # позицию старта в буфере.
-        if len(self) == self.maxlen:
+        if len(self) == len(self._buffer):
             self._start_index = (self._start_index - n) % len(self)
         # Для лучшей производительности алгоритма сторона
         # вращения определяется количеством необходимых
-        # перестановок.
+        # перестановок. Переставляемые элементы переносятся
+        # на другой конец очереди срезами буфера, а их прежние
+        # ячейки заполняются пустым значением.
         elif n <= len(self) // 2:
-            for _ in range(n):
-                self.appendleft(self.pop())
+            items = self._read(len(self) - n, len(self))
+            self._write(self._position(len(self) - n), [self._empty] * n)
+            self._start_index = (self._start_index - n) % len(self._buffer)
+            self._write(self._start_index, items)
+        else:
+            n = len(self) - n
+            items = self._read(0, n)
+            self._write(self._start_index, [self._empty] * n)
+            self._start_index = (self._start_index + n) % len(self._buffer)
+            self._write(self._position(len(self) - n), items)
+
+    def reverse(self):
+        items = self._read(0, len(self))
+        items.reverse()
+        self._write(self._start_index, items)
+
+
+class RingDequeView(typing.Sequence):
+    # Представление участка очереди с логическими индексами [start, stop)
+    # только для чтения. Элементы читаются из буфера очереди при обращении
+    # к ним. После структурного изменения очереди представление становится
+    # недействительным, и обращение к его элементам выбрасывает
+    # RuntimeError.
+    __slots__ = ('_deque', '_start', '_stop', '_state')
+
+    def __init__(self, deque, start, stop):
+        self._deque = deque
+        self._start = start
+        self._stop = stop
+        self._state = deque._state
+
+    def _check(self):
+        if self._deque._state != self._state:
+            raise RuntimeError('deque mutated after the view was created')
+
+    def __len__(self):
+        return self._stop - self._start
+
+    def __getitem__(self, index):
+        deque = self._deque
+        if deque._state != self._state:
+            self._check()
+        if isinstance(index, slice):
+            return self.tolist()[index]
+        size = self._stop - self._start
+        if not -size <= index < size:
+            raise IndexError('view index out of range')
+        index = index if index >= 0 else size + index
+        return deque._buffer[
+            (deque._start_index + self._start + index) % len(deque._buffer)
+        ]
+
+    def __iter__(self):
+        self._check()
+        deque = self._deque
+        for start, stop in deque._segments(self._start, self._stop):
+            for i in range(start, stop):
+                self._check()
+                # Как и в RingDeque.__iter__, буфер читается через очередь.
+                yield deque._buffer[i]
+
+    def tolist(self):
+        # Копирует элементы представления в список не более чем двумя
+        # срезами буфера.
+        self._check()
+        return self._deque._read(self._start, self._stop)
+
+    def __repr__(self):
+        return f'RingDequeView({self.tolist()})'
+
+
+class RingDequeSnapshot(typing.Sequence):
+    # Неизменяемый снимок очереди: буфер, который очередь больше не
+    # изменяет, с началом и количеством элементов на момент снимка.
+    __slots__ = ('_buffer', '_start_index', '_items_amount')
+
+    def __init__(self, buffer, start_index, items_amount):
+        self._buffer = buffer
+        self._start_index = start_index
+        self._items_amount = items_amount
+
+    def _segments(self):
+        end = self._start_index + self._items_amount
+        if end <= len(self._buffer):
+            return (self._start_index, end), (0, 0)
+        return (
+            (self._start_index, len(self._buffer)),
+            (0, end - len(self._buffer)),
+        )
+
+    def __len__(self):
+        return self._items_amount
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.tolist()[index]
+        if not -len(self) <= index < len(self):
+            raise IndexError('snapshot index out of range')
+        index = index if index >= 0 else len(self) + index
+        return self._buffer[(self._start_index + index) % len(self._buffer)]
+
+    def __iter__(self):
+        for start, stop in self._segments():
+            for i in range(start, stop):
+                yield self._buffer[i]
+
+    def tolist(self):
+        (a, b), (c, d) = self._segments()
+        return list(self._buffer[a:b]) + list(self._buffer[c:d])
+
+    def __repr__(self):
+        return f'RingDequeSnapshot({self.tolist()})'
+
+
+class TypedRingDeque(RingDeque):
+    # Типизированная очередь хранит элементы в array.array без отдельного
+    # объекта Python на каждый элемент. Поддерживаются только числовые
+    # коды типов.
+    __slots__ = ('_typecode',)
+    _empty = 0
+    _typecodes = 'bBhHiIlLqQfd'
+
+    def __init__(self, iterable=None, *, maxlen, typecode, growable=False):
+        # Проверка по кортежу, а не по строке, чтобы не пропустить
+        # подстроки вроде 'bB' или ''.
+        if typecode not in tuple(self._typecodes):
+            raise ValueError(
+                f'typecode must be one of {self._typecodes!r}, '
+                f'not {typecode!r}'
+            )
+        self._typecode = typecode
+        super().__init__(iterable, maxlen=maxlen, growable=growable)
+
+    @property
+    def typecode(self):
+        return self._typecode
+
+    def __repr__(self):
+        return (
+            f'TypedRingDeque({list(self)}, maxlen={self.maxlen}, '
+            f'typecode={self.typecode!r})'
+        )
+
+    def _allocate(self, size):
+        return array.array(self._typecode, bytes(
+            array.array(self._typecode).itemsize * size
+        ))
+
+    def _new(self, iterable=None):
+        return TypedRingDeque(iterable, **self._options())
+
+    def _options(self):
+        return dict(super()._options(), typecode=self.typecode)
+
+    def _read(self, start, stop):
+        return super()._read(start, stop).tolist()
+
+    def _dump(self):
+        # Элементы сериализуются массивом, а не списком объектов Python.
+        return super()._read(0, len(self))
+
+    def _tail(self, iterable):
+        # Массив с тем же кодом типа записывается в буфер без
+        # преобразования в список.
+        if isinstance(iterable, array.array) \
+                and iterable.typecode == self._typecode:
+            return iterable[-self.maxlen:]
+        return super()._tail(iterable)
+
+    def to_bytes(self):
+        # Компактное двоичное представление очереди: заголовок и элементы
+        # в логическом порядке. Размер элементов с кодами 'l' и 'L'
+        # зависит от платформы, поэтому такие данные переносимы только
+        # между платформами с одинаковым размером long.
+        items = self._dump()
+        if sys.byteorder == 'big':
+            items.byteswap()
+        return _BYTES_HEADER.pack(
+            self.typecode.encode(), self.growable, self.maxlen
+        ) + items.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data):
+        code, growable, maxlen = _BYTES_HEADER.unpack_from(data)
+        items = array.array(code.rstrip(b'\0').decode())
+        items.frombytes(memoryview(data)[_BYTES_HEADER.size:])
+        if sys.byteorder == 'big':
+            items.byteswap()
+        return cls(
+            items, maxlen=maxlen, typecode=items.typecode, growable=growable
+        )
+
+    def _write(self, position, items):
+        if not isinstance(items, array.array):
+            items = array.array(self._typecode, items)
+        super()._write(position, items)
+
+    def segments(self):
+        # Возвращает два memoryview на участки буфера с элементами очереди
+        # в логическом порядке. Второй участок пуст, если очередь не
+        # переходит через конец буфера. Пока существуют эти memoryview,
+        # их содержимое меняется вместе с очередью, но только пока очередь
+        # пишет в тот же буфер: после snapshot() или перевыделения буфера
+        # растущей очереди они продолжают показывать прежний буфер.
+        view = memoryview(self._buffer)
+        (a, b), (c, d) = self._segments()
+        return view[a:b], view[c:d]
+
+
+class NumpyRingDeque(RingDeque):
+    # Очередь хранит элементы в одномерном numpy.ndarray с фиксированным
+    # dtype. numpy импортируется только при создании такой очереди, поэтому
+    # для остальных очередей он не требуется.
+    __slots__ = ('_dtype',)
+    _empty = 0
+    # Виды dtype, для которых есть двоичное представление: логические,
+    # целые, вещественные и комплексные числа.
+    _byte_kinds = 'biufc'
+
+    def __init__(self, iterable=None, *, maxlen, dtype, growable=False):
+        import numpy
+        self._dtype = numpy.dtype(dtype)
+        super().__init__(iterable, maxlen=maxlen, growable=growable)
+
+    @property
+    def dtype(self):
+        return self._dtype
+
+    def __repr__(self):
+        return (
+            f'NumpyRingDeque({self._read(0, len(self))}, '
+            f'maxlen={self.maxlen}, dtype={self.dtype.name!r})'
+        )
+
+    def _allocate(self, size):
+        import numpy
+        return numpy.zeros(size, dtype=self._dtype)
+
+    def _copy_buffer(self):
+        # Срез ndarray - это представление, а не копия.
+        return self._buffer.copy()
+
+    def _new(self, iterable=None):
+        return NumpyRingDeque(iterable, **self._options())
+
+    def _options(self):
+        return dict(super()._options(), dtype=self.dtype)
+
+    def _read(self, start, stop):
+        (a, b), (c, d) = self._segments(start, stop)
+        return self._buffer[a:b].tolist() + self._buffer[c:d].tolist()
+
+    def _dump(self):
+        import numpy
+        (a, b), (c, d) = self._segments()
+        return numpy.concatenate((self._buffer[a:b], self._buffer[c:d]))
+
+    def to_bytes(self):
+        # Тот же формат, что у TypedRingDeque.to_bytes, но вместо кода типа
+        # array в заголовке хранится строка dtype.
+        self._check_byte_kind(self.dtype)
+        return _BYTES_HEADER.pack(
+            self.dtype.str.encode(), self.growable, self.maxlen
+        ) + self._dump().astype(self.dtype.newbyteorder('<')).tobytes()
+
+    @classmethod
+    def from_bytes(cls, data):
+        import numpy
+        code, growable, maxlen = _BYTES_HEADER.unpack_from(data)
+        dtype = numpy.dtype(code.rstrip(b'\0').decode())
+        cls._check_byte_kind(dtype)
+        items = numpy.frombuffer(
+            data, dtype=dtype.newbyteorder('<'), offset=_BYTES_HEADER.size
+        )
+        return cls(items, maxlen=maxlen, dtype=dtype, growable=growable)
+
+    @classmethod
+    def _check_byte_kind(cls, dtype):
+        # Объекты хранятся в буфере указателями, а строка dtype.str
+        # структурного типа не сохраняет его поля, поэтому такие очереди
+        # в двоичный формат не переводятся.
+        if dtype.kind not in tuple(cls._byte_kinds):
+            raise TypeError(
+                f'to_bytes supports only numeric dtypes, not {dtype}'
+            )
+
+    def _write(self, position, items):
+        import numpy
+        # Значения приводятся к dtype буфера до записи, чтобы ошибка
+        # преобразования не оставила буфер записанным наполовину.
+        super()._write(position, numpy.asarray(items, dtype=self._dtype))
+
+    def _tail(self, iterable):
+        import numpy
+        if isinstance(iterable, numpy.ndarray):
+            return iterable.reshape(-1)[-self.maxlen:]
+        return super()._tail(iterable)
+
+    def _views(self):
+        # Непустые участки буфера с элементами очереди в логическом порядке.
+        return [
+            self._buffer[start:stop]
+            for start, stop in self._segments() if stop > start
+        ]
+
+    def index(self, value, start=0, stop=None):
+        import numpy
+        start, stop, _ = slice(start, stop).indices(len(self))
+        stop = max(start, stop)
+        offset = start
+        for segment_start, segment_stop in self._segments(start, stop):
+            segment = self._buffer[segment_start:segment_stop]
+            found = numpy.flatnonzero(segment == value)
+            if len(found):
+                return offset + int(found[0])
+            offset += len(segment)
+        raise ValueError(f'{value!r} is not in deque')
+
+    def segments(self):
+        # Возвращает два представления участков буфера без копирования.
+        # Второй участок пуст, если очередь не переходит через конец буфера.
+        # Как и у TypedRingDeque.segments, представления перестают следовать
+        # за очередью, когда она заменяет буфер после snapshot() или при
+        # перевыделении.
+        (a, b), (c, d) = self._segments()
+        return self._buffer[a:b], self._buffer[c:d]
+
+    def as_array(self):
+        # Если очередь не переходит через конец буфера, возвращается
+        # представление буфера без копирования, иначе - одна конкатенация.
+        import numpy
+        head, tail = self.segments()
+        if len(tail) == 0:
+            return head
+        return numpy.concatenate((head, tail))
+
+    def sum(self):
+        return sum((view.sum() for view in self._views()), self._dtype.type(0))
+
+    def mean(self):
+        if not self:
+            raise ValueError('mean of an empty deque')
+        return self.sum() / len(self)
+
+    def min(self):
+        if not self:
+            raise ValueError('min of an empty deque')
+        return min(view.min() for view in self._views())
+
+    def max(self):
+        if not self:
+            raise ValueError('max of an empty deque')
+        return max(view.max() for view in self._views())
+
+    def percentile(self, q):
+        import numpy
+        if not self:
+            raise ValueError('percentile of an empty deque')
+        return numpy.percentile(self.as_array(), q)
+
+
+class RollingRingDeque(RingDeque):
+    # Очередь, поддерживающая статистики по своим элементам при каждом
+    # изменении. Сумма, среднее и дисперсия обновляются за O(1) по методу
+    # Уэлфорда. Минимум и максимум хранятся в монотонных очередях пар
+    # (порядковый номер, значение), которые обновляются за амортизированное
+    # O(1), пока элементы добавляются справа и вытесняются слева. После
+    # остальных изменений монотонные очереди перестраиваются при следующем
+    # запросе минимума или максимума.
+    __slots__ = (
+        '_amount', '_sum', '_mean', '_squares', '_first_number',
+        '_minimums', '_maximums', '_extrema_valid',
+    )
+
+    def __init__(self, iterable=None, *, maxlen, growable=False):
+        self._reset_statistics()
+        super().__init__(iterable, maxlen=maxlen, growable=growable)
+
+    def _new(self, iterable=None):
+        return RollingRingDeque(iterable, **self._options())
+
+    def __copy__(self):
+        # Статистики копии накапливаются заново при добавлении элементов.
+        return self._new(self._read(0, len(self)))
+
+    def _reset_statistics(self):
+        self._amount = 0
+        self._sum = 0
+        self._mean = 0.0
+        self._squares = 0.0
+        # Порядковый номер первого элемента очереди. Номера остальных
+        # элементов идут подряд за ним.
+        self._first_number = 0
+        self._minimums = collections.deque()
+        self._maximums = collections.deque()
+        self._extrema_valid = True
+
+    def _add(self, item):
+        self._amount += 1
+        self._sum += item
+        delta = item - self._mean
+        self._mean += delta / self._amount
+        self._squares += delta * (item - self._mean)
+
+    def _discard(self, item):
+        self._amount -= 1
+        self._sum -= item
+        if self._amount == 0:
+            self._sum = 0
+            self._mean = 0.0
+            self._squares = 0.0
+            return
+        delta = item - self._mean
+        self._mean -= delta / self._amount
+        self._squares -= delta * (item - self._mean)
+
+    def _push_extrema(self, number, item):
+        if not self._extrema_valid:
+            return
+        while self._minimums and self._minimums[-1][1] >= item:
+            self._minimums.pop()
+        self._minimums.append((number, item))
+        while self._maximums and self._maximums[-1][1] <= item:
+            self._maximums.pop()
+        self._maximums.append((number, item))
+
+    def _pushleft_extrema(self, number, item):
+        # Элемент, добавленный слева, попадает в монотонную очередь, только
+        # если он строго меньше (больше) всех остальных элементов.
+        if not self._extrema_valid:
+            return
+        if not self._minimums or item < self._minimums[0][1]:
+            self._minimums.appendleft((number, item))
+        if not self._maximums or item > self._maximums[0][1]:
+            self._maximums.appendleft((number, item))
+
+    def _evict_extrema(self):
+        while self._minimums and self._minimums[0][0] < self._first_number:
+            self._minimums.popleft()
+        while self._maximums and self._maximums[0][0] < self._first_number:
+            self._maximums.popleft()
+
+    def _invalidate_extrema(self):
+        self._extrema_valid = False
+        self._minimums.clear()
+        self._maximums.clear()
+
+    def _rebuild_extrema(self):
+        self._extrema_valid = True
+        self._first_number = 0
+        for number, item in enumerate(self):
+            self._push_extrema(number, item)
+
+    def _rebuild(self):
+        items = self._read(0, len(self))
+        self._reset_statistics()
+        for item in items:
+            self._add(item)
+        self._invalidate_extrema()
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            super().__setitem__(index, value)
+            self._rebuild()
+            return
+        old = self[index]
+        super().__setitem__(index, value)
+        self._discard(old)
+        self._add(value)
+        self._invalidate_extrema()
+
+    def __delitem__(self, index):
+        if isinstance(index, slice):
+            super().__delitem__(index)
+            self._rebuild()
+            return
+        item = self[index]
+        super().__delitem__(index)
+        self._discard(item)
+        self._invalidate_extrema()
+
+    def append(self, item):
+        if self.maxlen == 0:
+            return
+        evicted = self._read(0, 1) if len(self) == self.maxlen else []
+        number = self._first_number + len(self)
+        super().append(item)
+        for old in evicted:
+            self._discard(old)
+        self._add(item)
+        self._push_extrema(number, item)
+        self._first_number += len(evicted)
+        self._evict_extrema()
+
+    def appendleft(self, item):
+        if self.maxlen == 0:
+            return
+        if len(self) == self.maxlen:
+            self._invalidate_extrema()
+            evicted = self._read(len(self) - 1, len(self))
+        else:
+            evicted = []
+        super().appendleft(item)
+        for old in evicted:
+            self._discard(old)
+        self._add(item)
+        self._first_number -= 1
+        self._pushleft_extrema(self._first_number, item)
+
+    def extend(self, iterable):
+        if self.maxlen == 0:
+            return
+        items = self._tail(iterable)
+        overflow = max(len(self) + len(items) - self.maxlen, 0)
+        evicted = self._read(0, overflow)
+        number = self._first_number + len(self)
+        super().extend(items)
+        # Статистики обновляются так, как если бы элементы добавлялись и
+        # вытеснялись по одному.
+        for old in evicted:
+            self._discard(old)
+        for number, item in enumerate(items, number):
+            self._add(item)
+            self._push_extrema(number, item)
+        self._first_number += overflow
+        self._evict_extrema()
+
+    def extendleft(self, iterable):
+        if self.maxlen == 0:
+            return
+        items = self._tail(iterable)
+        overflow = max(len(self) + len(items) - self.maxlen, 0)
+        if overflow:
+            self._invalidate_extrema()
+        evicted = self._read(len(self) - overflow, len(self))
+        super().extendleft(items)
+        for old in evicted:
+            self._discard(old)
+        for item in items:
+            self._add(item)
+            self._first_number -= 1
+            self._pushleft_extrema(self._first_number, item)
+
+    def insert(self, index, item):
+        super().insert(index, item)
+        self._add(item)
+        self._invalidate_extrema()
+
+    def pop(self, index=-1):
+        if index != -1:
+            return super().pop(index)
+        item = super().pop()
+        self._discard(item)
+        self._invalidate_extrema()
+        return item
+
+    def popleft(self):
+        item = super().popleft()
+        self._discard(item)
+        self._first_number += 1
+        self._evict_extrema()
+        return item
+
+    def popleft_many(self, n):
+        items = super().popleft_many(n)
+        for item in items:
+            self._discard(item)
+        self._first_number += len(items)
+        self._evict_extrema()
+        return items
+
+    def pop_many(self, n):
+        items = super().pop_many(n)
+        for item in items:
+            self._discard(item)
+        if items:
+            self._invalidate_extrema()
+        return items
+
+    def clear(self):
+        super().clear()
+        self._reset_statistics()
+
+    def resize(self, maxlen):
+        dropped = len(self) > maxlen
+        super().resize(maxlen)
+        if dropped:
+            self._rebuild()
+
+    def rotate(self, n=1):
+        super().rotate(n)
+        self._invalidate_extrema()
+
+    def reverse(self):
+        super().reverse()
+        self._invalidate_extrema()
+
+    def sum(self):
+        return self._sum
+
+    def mean(self):
+        if not self:
+            raise ValueError('mean of an empty deque')
+        return self._mean
+
+    def variance(self):
+        if not self:
+            raise ValueError('variance of an empty deque')
+        return max(self._squares, 0.0) / len(self)
+
+    def min(self):
+        if not self:
+            raise ValueError('min of an empty deque')
+        if not self._extrema_valid:
+            self._rebuild_extrema()
+        return self._minimums[0][1]
+
+    def max(self):
+        if not self:
+            raise ValueError('max of an empty deque')
+        if not self._extrema_valid:
+            self._rebuild_extrema()
+        return self._maximums[0][1]
+
+
+class FileSink:
+    # Приемник вытесненных элементов, который дописывает пакеты в конец
+    # файла. Каждый пакет сохраняется как сжатый zlib pickle со значением
+    # длины перед ним. Итерация по приемнику возвращает все сохраненные
+    # элементы по порядку. Недописанный из-за сбоя последний пакет
+    # пропускается.
+    _length = struct.Struct('<I')
+
+    def __init__(self, path, *, compresslevel=6):
+        self._path = path
+        self._compresslevel = compresslevel
+        self._file = open(path, 'ab')
+
+    @property
+    def path(self):
+        return self._path
+
+    def __call__(self, batch):
+        data = zlib.compress(pickle.dumps(batch), self._compresslevel)
+        self._file.write(self._length.pack(len(data)) + data)
+        self._file.flush()
+
+    def __iter__(self):
+        with open(self._path, 'rb') as file:
+            while True:
+                header = file.read(self._length.size)
+                if len(header) < self._length.size:
+                    return
+                size, = self._length.unpack(header)
+                data = file.read(size)
+                if len(data) < size:
+                    return
+                yield from pickle.loads(zlib.decompress(data))
+
+    def close(self):
+        self._file.close()
+
+
+class SpillingRingDeque(RingDeque):
+    # Очередь, которая не теряет вытесненные элементы, а собирает их в
+    # пакеты по batch_size элементов и передает в sink: любой вызываемый
+    # объект, принимающий список, например FileSink. Вытесненными
+    # считаются элементы, удаленные из очереди при переполнении, в том числе
+    # элементы extend, которые не поместились бы в очередь. Явно удаленные
+    # элементы (pop, del, clear) в sink не попадают.
+    __slots__ = ('_sink', '_batch_size', '_pending')
+
+    def __init__(self, iterable=None, *, maxlen, sink, batch_size=1024,
+                 growable=False):
+        if batch_size <= 0:
+            raise ValueError('batch_size must be positive')
+        self._sink = sink
+        self._batch_size = batch_size
+        self._pending = []
+        super().__init__(iterable, maxlen=maxlen, growable=growable)
+
+    @property
+    def sink(self):
+        return self._sink
+
+    def _new(self, iterable=None):
+        # Копии, срезы и результаты + и * передают вытесненные элементы в
+        # тот же sink. Элементы, накопленные для следующего пакета, остаются
+        # у исходной очереди.
+        return SpillingRingDeque(iterable, **self._options())
+
+    def _options(self):
+        return dict(
+            super()._options(), sink=self._sink, batch_size=self._batch_size
+        )
+
+    def __reduce__(self):
+        # Элементы, накопленные для следующего пакета, восстанавливаются
+        # вместе с очередью. Сам sink должен поддерживать pickle.
+        return super().__reduce__() + ((None, {'_pending': self._pending}),)
+
+    def _spill(self, items):
+        self._pending.extend(items)
+        if len(self._pending) >= self._batch_size:
+            full = len(self._pending) - len(self._pending) % self._batch_size
+            for start in range(0, full, self._batch_size):
+                self._sink(self._pending[start:start + self._batch_size])
+            del self._pending[:full]
+
+    def flush(self):
+        # Передает в sink накопленные элементы, не дожидаясь полного пакета.
+        if self._pending:
+            self._sink(self._pending)
+            self._pending = []
+
+    def history(self):
+        # Возвращает итератор по всем элементам: сначала по сохраненным в
+        # sink, если по нему можно итерироваться, затем по накопленным для
+        # следующего пакета и, наконец, по элементам самой очереди.
+        if isinstance(self._sink, typing.Iterable):
+            yield from self._sink
+        yield from list(self._pending)
+        yield from self
+
+    def append(self, item):
+        if self.maxlen == 0:
+            self._spill((item,))
+            return
+        if len(self) == self.maxlen:
+            self._spill((self._buffer[self._start_index],))
+        super().append(item)
+
+    def appendleft(self, item):
+        if self.maxlen == 0:
+            self._spill((item,))
+            return
+        if len(self) == self.maxlen:
+            self._spill((self._buffer[self._position(len(self) - 1)],))
+        super().appendleft(item)
+
+    def extend(self, iterable):
+        items = list(iterable)
+        overflow = len(self) + len(items) - self.maxlen
+        if overflow > 0:
+            evicted = min(overflow, len(self))
+            self._spill(
+                self._read(0, evicted)
+                + items[:max(len(items) - self.maxlen, 0)]
+            )
+            items = items[len(items) - min(len(items), self.maxlen):]
+        super().extend(items)
+
+    def extendleft(self, iterable):
+        items = list(iterable)
+        overflow = len(self) + len(items) - self.maxlen
+        if overflow > 0:
+            evicted = min(overflow, len(self))
+            # При добавлении слева элементы вытесняются с правого конца,
+            # начиная с последнего.
+            self._spill(
+                self._read(len(self) - evicted, len(self))[::-1]
+                + items[:max(len(items) - self.maxlen, 0)]
+            )
+            items = items[len(items) - min(len(items), self.maxlen):]
+        super().extendleft(items)
+
+    def resize(self, maxlen):
+        # Элементы, не поместившиеся в уменьшенную очередь, считаются
+        # вытесненными.
+        maxlen = operator.index(maxlen)
+        evicted = self._read(0, max(len(self) - maxlen, 0))
+        super().resize(maxlen)
+        self._spill(evicted)
+
+
+class IndexedRingDeque(RingDeque):
+    # Очередь с индексом значений для проверки вхождения, count и index за
+    # O(1). Для каждого значения хранится количество его вхождений и
+    # очередь порядковых номеров его элементов. Номера, как и в
+    # RollingRingDeque, идут подряд от номера первого элемента и остаются
+    # верными, пока элементы добавляются и удаляются только с концов. После
+    # остальных изменений номера перестраиваются при следующем вызове index.
+    # Элементы очереди должны быть хешируемыми.
+    __slots__ = ('_counts', '_numbers', '_first_number', '_numbers_valid')
+
+    def __init__(self, iterable=None, *, maxlen, growable=False):
+        self._counts = {}
+        self._numbers = {}
+        self._first_number = 0
+        self._numbers_valid = True
+        super().__init__(iterable, maxlen=maxlen, growable=growable)
+
+    def _new(self, iterable=None):
+        return IndexedRingDeque(iterable, **self._options())
+
+    def __copy__(self):
+        # Индекс копии строится заново при добавлении элементов.
+        return self._new(self._read(0, len(self)))
+
+    def _add(self, item):
+        self._counts[item] = self._counts.get(item, 0) + 1
+
+    def _discard(self, item):
+        amount = self._counts[item] - 1
+        if amount:
+            self._counts[item] = amount
+        else:
+            del self._counts[item]
+
+    def _push_number(self, number, item):
+        if self._numbers_valid:
+            numbers = self._numbers.get(item)
+            if numbers is None:
+                numbers = self._numbers[item] = collections.deque()
+            numbers.append(number)
+
+    def _pushleft_number(self, number, item):
+        if self._numbers_valid:
+            numbers = self._numbers.get(item)
+            if numbers is None:
+                numbers = self._numbers[item] = collections.deque()
+            numbers.appendleft(number)
+
+    def _discard_number(self, item, left):
+        # Удаляет номер первого (left) или последнего вхождения item.
+        if self._numbers_valid:
+            numbers = self._numbers[item]
+            numbers.popleft() if left else numbers.pop()
+            if not numbers:
+                del self._numbers[item]
+
+    def _invalidate_numbers(self):
+        self._numbers_valid = False
+        self._numbers.clear()
+
+    def _rebuild_numbers(self):
+        self._numbers_valid = True
+        self._first_number = 0
+        for number, item in enumerate(self):
+            self._push_number(number, item)
+
+    def _rebuild(self):
+        self._counts.clear()
+        for item in self:
+            self._add(item)
+        self._invalidate_numbers()
+
+    def __contains__(self, value):
+        try:
+            return value in self._counts
+        except TypeError:
+            return False
+
+    def count(self, value):
+        try:
+            return self._counts.get(value, 0)
+        except TypeError:
+            return 0
+
+    def index(self, value, start=0, stop=None):
+        if value not in self:
+            raise ValueError(f'{value!r} is not in deque')
+        if start != 0 or stop is not None:
+            return super().index(value, start, stop)
+        if not self._numbers_valid:
+            self._rebuild_numbers()
+        return self._numbers[value][0] - self._first_number
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            super().__setitem__(index, value)
+            self._rebuild()
+            return
+        hash(value)
+        old = self[index]
+        super().__setitem__(index, value)
+        self._discard(old)
+        self._add(value)
+        self._invalidate_numbers()
+
+    def __delitem__(self, index):
+        if isinstance(index, slice):
+            super().__delitem__(index)
+            self._rebuild()
+            return
+        item = self[index]
+        super().__delitem__(index)
+        self._discard(item)
+        self._invalidate_numbers()
+
+    def append(self, item):
+        hash(item)
+        if self.maxlen == 0:
+            return
+        number = self._first_number + len(self)
+        if len(self) < self.maxlen:
+            super().append(item)
+        else:
+            old = self._buffer[self._start_index]
+            super().append(item)
+            self._discard(old)
+            self._discard_number(old, left=True)
+            self._first_number += 1
+        self._add(item)
+        self._push_number(number, item)
+
+    def appendleft(self, item):
+        hash(item)
+        if self.maxlen == 0:
+            return
+        if len(self) == self.maxlen:
+            evicted = self._read(len(self) - 1, len(self))
         else:
-            for _ in range(len(self) - n):
-                self.append(self.popleft())
\ No newline at end of file
+            evicted = []
+        super().appendleft(item)
+        for old in evicted:
+            self._discard(old)
+            self._discard_number(old, left=False)
+        self._add(item)
+        self._first_number -= 1
+        self._pushleft_number(self._first_number, item)
+
+    def extend(self, iterable):
+        if self.maxlen == 0:
+            return
+        items = self._tail(iterable)
+        for item in items:
+            hash(item)
+        overflow = max(len(self) + len(items) - self.maxlen, 0)
+        evicted = self._read(0, overflow)
+        number = self._first_number + len(self)
+        super().extend(items)
+        for old in evicted:
+            self._discard(old)
+            self._discard_number(old, left=True)
+        self._first_number += overflow
+        for number, item in enumerate(items, number):
+            self._add(item)
+            self._push_number(number, item)
+
+    def extendleft(self, iterable):
+        if self.maxlen == 0:
+            return
+        items = self._tail(iterable)
+        for item in items:
+            hash(item)
+        overflow = max(len(self) + len(items) - self.maxlen, 0)
+        evicted = self._read(len(self) - overflow, len(self))
+        super().extendleft(items)
+        for old in evicted:
+            self._discard(old)
+            self._discard_number(old, left=False)
+        for item in items:
+            self._add(item)
+            self._first_number -= 1
+            self._pushleft_number(self._first_number, item)
+
+    def insert(self, index, item):
+        hash(item)
+        super().insert(index, item)
+        self._add(item)
+        self._invalidate_numbers()
+
+    def pop(self, index=-1):
+        if index != -1:
+            return super().pop(index)
+        item = super().pop()
+        self._discard(item)
+        self._discard_number(item, left=False)
+        return item
+
+    def popleft(self):
+        item = super().popleft()
+        self._discard(item)
+        self._discard_number(item, left=True)
+        self._first_number += 1
+        return item
+
+    def popleft_many(self, n):
+        items = super().popleft_many(n)
+        for item in items:
+            self._discard(item)
+            self._discard_number(item, left=True)
+        self._first_number += len(items)
+        return items
+
+    def pop_many(self, n):
+        items = super().pop_many(n)
+        for item in items:
+            self._discard(item)
+            self._discard_number(item, left=False)
+        return items
+
+    def clear(self):
+        super().clear()
+        self._counts.clear()
+        self._numbers.clear()
+        self._first_number = 0
+        self._numbers_valid = True
+
+    def resize(self, maxlen):
+        dropped = len(self) > maxlen
+        super().resize(maxlen)
+        if dropped:
+            self._rebuild()
+
+    def rotate(self, n=1):
+        super().rotate(n)
+        self._invalidate_numbers()
+
+    def reverse(self):
+        super().reverse()
+        self._invalidate_numbers()
+
+
+class TimeWindowRingDeque(RingDeque):
+    # Очередь отметок времени или элементов с отметками, которые
+    # возвращает функция key. Отметки должны не убывать слева направо,
+    # поэтому элементы, нарушающие порядок, не добавляются, а rotate,
+    # reverse и присваивание срезу не поддерживаются. Элементы старше
+    # horizon относительно самой новой отметки вытесняются при каждом
+    # добавлении или по вызову evict одним сдвигом начала очереди. Поиск
+    # по времени выполняется двоичным поиском по логическим индексам.
+
+    __slots__ = ('_horizon', '_key')
+
+    def __init__(self, iterable=None, *, maxlen, horizon, key=None,
+                 growable=False):
+        if horizon < 0:
+            raise ValueError('horizon must be non-negative')
+        self._horizon = horizon
+        self._key = key
+        super().__init__(iterable, maxlen=maxlen, growable=growable)
+
+    @property
+    def horizon(self):
+        return self._horizon
+
+    @property
+    def key(self):
+        return self._key
+
+    def _new(self, iterable=None):
+        return TimeWindowRingDeque(iterable, **self._options())
+
+    def _options(self):
+        return dict(super()._options(), horizon=self.horizon, key=self.key)
+
+    def _timestamp(self, item):
+        return item if self._key is None else self._key(item)
+
+    def _timestamp_at(self, index):
+        return self._timestamp(self._buffer[self._position(index)])
+
+    def _bisect(self, timestamp):
+        # Возвращает логический индекс первого элемента с отметкой не
+        # меньше timestamp.
+        low, high = 0, len(self)
+        while low < high:
+            middle = (low + high) // 2
+            if self._timestamp_at(middle) < timestamp:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _check_order(self, index, items, replace=False):
+        # Проверяет, что items можно поставить перед элементом с индексом
+        # index или, если replace, вместо него, не нарушив порядок отметок.
+        timestamps = [self._timestamp(item) for item in items]
+        if index > 0:
+            timestamps.insert(0, self._timestamp_at(index - 1))
+        if replace:
+            index += 1
+        if index < len(self):
+            timestamps.append(self._timestamp_at(index))
+        if any(a > b for a, b in zip(timestamps, timestamps[1:])):
+            raise ValueError('timestamps must be non-decreasing')
+
+    def evict(self, now=None):
+        # Вытесняет элементы с отметками старше now - horizon, по умолчанию
+        # относительно самой новой отметки. Все они удаляются одним сдвигом
+        # начала очереди.
+        if not self:
+            return
+        if now is None:
+            now = self._timestamp_at(len(self) - 1)
+        amount = self._bisect(now - self._horizon)
+        if amount:
+            self._close_gap(0, amount)
+
+    def range(self, start, stop):
+        # Возвращает список элементов с отметками из [start, stop).
+        low = self._bisect(start)
+        return self._read(low, max(self._bisect(stop), low))
+
+    def since(self, timestamp):
+        # Возвращает список элементов с отметками не меньше timestamp.
+        return self._read(self._bisect(timestamp), len(self))
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            raise TypeError('slice assignment is not supported')
+        if not -len(self) <= index < len(self):
+            raise IndexError('deque index out of range')
+        index = index if index >= 0 else len(self) + index
+        self._check_order(index, [value], replace=True)
+        super().__setitem__(index, value)
+        self.evict()
+
+    def append(self, item):
+        self._check_order(len(self), [item])
+        super().append(item)
+        self.evict()
+
+    def appendleft(self, item):
+        self._check_order(0, [item])
+        super().appendleft(item)
+        self.evict()
+
+    def extend(self, iterable):
+        items = self._tail(iterable)
+        self._check_order(len(self), items)
+        super().extend(items)
+        self.evict()
+
+    def extendleft(self, iterable):
+        items = self._tail(iterable)
+        self._check_order(0, items[::-1])
+        super().extendleft(items)
+        self.evict()
+
+    def insert(self, index, item):
+        if abs(index) >= len(self):
+            position = len(self) if index > 0 else 0
+        else:
+            position = index if index >= 0 else len(self) + index
+        self._check_order(position, [item])
+        super().insert(index, item)
+        self.evict()
+
+    def rotate(self, n=1):
+        raise TypeError('rotate would break the timestamp order')
+
+    def reverse(self):
+        raise TypeError('reverse would break the timestamp order')
+
+    def __mul__(self, n):
+        raise TypeError('repetition would break the timestamp order')
+
+    def __imul__(self, n):
+        raise TypeError('repetition would break the timestamp order')
@@ -0,0 +1,303 @@
+import mmap
+import os
+import struct
+import zlib
+
+# Файл журнала состоит из трех частей:
+#
+# * неизменяемого заголовка с параметрами журнала, который записывается
+#   один раз при создании файла;
+# * изменяемого заголовка с номером следующей записи (поколением), номером
+#   первой записи, количеством записей и признаком корректного закрытия;
+# * таблицы ячеек и области данных.
+#
+# Каждая ячейка таблицы описывает одну запись: ее порядковый номер, смещение
+# и длину данных в области данных и контрольную сумму, которая покрывает и
+# описание, и сами данные. Запись с номером n всегда хранится в ячейке
+# n % slots, а номера начинаются с 1, поэтому нулевая ячейка пуста.
+#
+# Записи фиксированного размера хранятся каждая на своем месте области
+# данных, как элементы в буфере RingDeque. Записи переменного размера
+# пишутся в область данных подряд по кругу, вытесняя самые старые записи,
+# которые им мешают.
+_MAGIC = b'RINGLOG\x00'
+_VERSION = 1
+_STATIC = struct.Struct('<8sIIQQQ')
+_DYNAMIC = struct.Struct('<QQQII')
+_DYNAMIC_OFFSET = 64
+_TABLE_OFFSET = 128
+_ENTRY = struct.Struct('<QQII')
+_VARIABLE = 1
+
+
+class RingLogError(Exception):
+    pass
+
+
+class RingLog:
+    # Журнал последних записей в файле, отображенном в память. Добавление
+    # записи меняет только ее данные, ее ячейку и изменяемый заголовок. При
+    # открытии журнала, который не был корректно закрыт, его состояние
+    # восстанавливается по ячейкам: записи с неверной контрольной суммой,
+    # например недописанные из-за сбоя, отбрасываются.
+    #
+    # Для создания журнала с записями фиксированного размера передаются
+    # slots и slot_size, для записей переменного размера - slots и
+    # data_size. Для открытия существующего журнала достаточно пути.
+
+    def __init__(self, path, *, slots=None, slot_size=None, data_size=None):
+        exists = os.path.exists(path) and os.path.getsize(path) > 0
+        if not exists:
+            self._create(path, slots, slot_size, data_size)
+        self._file = open(path, 'r+b')
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        magic, version, flags, self._slots, self._slot_size, \
+            self._data_size = _STATIC.unpack_from(self._map, 0)
+        if magic != _MAGIC or version != _VERSION:
+            self.close()
+            raise RingLogError(f'{path!r} is not a ring log')
+        self._variable = bool(flags & _VARIABLE)
+        if exists and (
+            slots is not None and slots != self._slots
+            or slot_size is not None and slot_size != self._slot_size
+            or data_size is not None and data_size != self._data_size
+        ):
+            self._map.close()
+            self._file.close()
+            raise ValueError('parameters do not match the existing ring log')
+        self._data_offset = _TABLE_OFFSET + self._slots * _ENTRY.size
+        if not self._load_header():
+            self._recover()
+        # Признак корректного закрытия снимается при открытии и снова
+        # устанавливается в close.
+        self._write_header(clean=False)
+
+    @staticmethod
+    def _create(path, slots, slot_size, data_size):
+        if slots is None or slots <= 0:
+            raise ValueError('slots must be positive')
+        if (slot_size is None) == (data_size is None):
+            raise ValueError(
+                'exactly one of slot_size and data_size is required'
+            )
+        if slot_size is not None:
+            if slot_size < 0:
+                raise ValueError('slot_size must be non-negative')
+            flags, data_size = 0, slots * slot_size
+        else:
+            if data_size < 0:
+                raise ValueError('data_size must be non-negative')
+            flags, slot_size = _VARIABLE, 0
+        size = _TABLE_OFFSET + slots * _ENTRY.size + data_size
+        with open(path, 'wb') as file:
+            file.write(_STATIC.pack(
+                _MAGIC, _VERSION, flags, slots, slot_size, data_size
+            ))
+            file.truncate(max(size, mmap.PAGESIZE))
+
+    @property
+    def slots(self):
+        return self._slots
+
+    @property
+    def slot_size(self):
+        return self._slot_size if not self._variable else None
+
+    @property
+    def data_size(self):
+        return self._data_size
+
+    @property
+    def generation(self):
+        return self._next_number
+
+    def __len__(self):
+        return self._items_amount
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _load_header(self):
+        # Возвращает True, если журнал был корректно закрыт и его
+        # изменяемый заголовок не поврежден.
+        fields = _DYNAMIC.unpack_from(self._map, _DYNAMIC_OFFSET)
+        *values, clean, checksum = fields
+        if checksum != self._header_checksum(*values, clean) or not clean:
+            return False
+        self._next_number, self._first_number, self._items_amount = values
+        return True
+
+    @staticmethod
+    def _header_checksum(next_number, first_number, items_amount, clean):
+        return zlib.crc32(_DYNAMIC.pack(
+            next_number, first_number, items_amount, clean, 0
+        ))
+
+    def _write_header(self, clean=False):
+        values = (
+            self._next_number, self._first_number, self._items_amount, clean
+        )
+        _DYNAMIC.pack_into(
+            self._map, _DYNAMIC_OFFSET, *values, self._header_checksum(*values)
+        )
+
+    def _entry(self, number):
+        # Возвращает смещение и длину данных записи с номером number или
+        # None, если ячейка не содержит эту запись целиком.
+        entry_offset = _TABLE_OFFSET + number % self._slots * _ENTRY.size
+        stored, offset, length, checksum = _ENTRY.unpack_from(
+            self._map, entry_offset
+        )
+        if stored != number or number == 0:
+            return None
+        if offset + length > self._data_size:
+            return None
+        start = self._data_offset + offset
+        if checksum != self._checksum(
+            number, offset, length, self._map[start:start + length]
+        ):
+            return None
+        return offset, length
+
+    @staticmethod
+    def _checksum(number, offset, length, data):
+        header = _ENTRY.pack(number, offset, length, 0)
+        return zlib.crc32(data, zlib.crc32(header))
+
+    def _recover(self):
+        # Находим запись с наибольшим номером среди неповрежденных и идем от
+        # нее назад, пока номера записей идут подряд.
+        last = 0
+        for index in range(self._slots):
+            number = _ENTRY.unpack_from(
+                self._map, _TABLE_OFFSET + index * _ENTRY.size
+            )[0]
+            if number > last and self._entry(number) is not None:
+                last = number
+        first = last + 1
+        while first > 1 and last - first + 1 < self._slots \
+                and self._entry(first - 1) is not None:
+            first -= 1
+        self._next_number = last + 1
+        self._first_number = first
+        self._items_amount = last - first + 1
+
+    def _clear_entry(self, number):
+        _ENTRY.pack_into(
+            self._map, _TABLE_OFFSET + number % self._slots * _ENTRY.size,
+            0, 0, 0, 0,
+        )
+
+    def _evict(self):
+        self._clear_entry(self._first_number)
+        self._first_number += 1
+        self._items_amount -= 1
+
+    def _valid_entry(self, number):
+        entry = self._entry(number)
+        if entry is None:
+            raise RingLogError(
+                f'record {number - self._first_number} is corrupted'
+            )
+        return entry
+
+    def _place(self, length):
+        # Выбирает смещение для новой записи и вытесняет записи, которые
+        # окажутся перезаписаны. Последняя запись нужна, чтобы найти место
+        # для новой, поэтому ее повреждение обнаруживается до вытеснения.
+        if self._variable and self._items_amount:
+            last_offset, last_length = self._valid_entry(
+                self._next_number - 1
+            )
+        if self._items_amount == self._slots:
+            self._evict()
+        if not self._variable:
+            return self._next_number % self._slots * self._slot_size
+        if not self._items_amount:
+            return 0
+        end = last_offset + last_length
+        # Новая запись занимает байты сразу после последней записи, а если
+        # она там не помещается, то пропускает конец области данных и
+        # пишется с ее начала. Конец области данных равнозначен ее началу,
+        # поэтому даже пустая запись туда не пишется.
+        if end < self._data_size and end + length <= self._data_size:
+            offset, used = end, [(end, end + length)]
+        else:
+            offset, used = 0, [(end, self._data_size), (0, length)]
+        # Самые старые записи лежат сразу за последней, поэтому достаточно
+        # вытеснять их по одной, пока они попадают в занимаемые байты.
+        # Поврежденная самая старая запись все равно не может быть
+        # прочитана, поэтому она просто вытесняется.
+        while self._items_amount:
+            entry = self._entry(self._first_number)
+            if entry is None:
+                self._evict()
+                continue
+            first_offset, first_length = entry
+            if not any(
+                start <= first_offset < stop
+                or first_offset < start < first_offset + first_length
+                for start, stop in used
+            ):
+                break
+            self._evict()
+        return offset
+
+    def append(self, record):
+        data = memoryview(record).cast('B')
+        if not self._variable and len(data) != self._slot_size:
+            raise ValueError(f'record size must be {self._slot_size}')
+        if len(data) > self._data_size:
+            raise ValueError('record is larger than the ring log data area')
+        number = self._next_number
+        offset = self._place(len(data))
+        start = self._data_offset + offset
+        self._map[start:start + len(data)] = data
+        _ENTRY.pack_into(
+            self._map, _TABLE_OFFSET + number % self._slots * _ENTRY.size,
+            number, offset, len(data),
+            self._checksum(number, offset, len(data), data),
+        )
+        self._next_number += 1
+        self._items_amount += 1
+        self._write_header()
+
+    def popleft(self):
+        if not self._items_amount:
+            raise IndexError('pop from an empty ring log')
+        record = self[0]
+        self._evict()
+        self._write_header()
+        return record
+
+    def clear(self):
+        while self._items_amount:
+            self._evict()
+        self._write_header()
+
+    def __getitem__(self, index):
+        if not -len(self) <= index < len(self):
+            raise IndexError('ring log index out of range')
+        index = index if index >= 0 else len(self) + index
+        offset, length = self._valid_entry(self._first_number + index)
+        start = self._data_offset + offset
+        return self._map[start:start + length]
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def flush(self):
+        self._map.flush()
+
+    def close(self):
+        if self._map.closed:
+            return
+        if hasattr(self, '_items_amount'):
+            self._write_header(clean=True)
+            self._map.flush()
+        self._map.close()
+        self._file.close()
@@ -0,0 +1,312 @@
+import bisect
+import collections
+import time
+import typing
+
+# Кольца всех ключей хранятся в общих списках-слябах по классам емкости:
+# 4, 8, 16 и так далее до maxlen. Кольцо ключа занимает в слябе своего
+# класса участок из capacity ячеек, а начало и количество элементов кольца
+# хранятся в списках того же класса по номеру участка. Кольцо начинается в
+# наименьшем классе и переселяется в следующий, когда перестает в нем
+# помещаться, поэтому ключи с несколькими элементами не занимают maxlen
+# ячеек. Класс и номер участка ключа упакованы в одно целое число.
+_MIN_CAPACITY = 4
+_CLASS_BITS = 6
+_CLASS_MASK = (1 << _CLASS_BITS) - 1
+
+
+class RingDequeMap(typing.MutableMapping):
+    # Словарь колец с одинаковой максимальной длиной maxlen. По ключу
+    # возвращается RingView - представление кольца ключа только для
+    # чтения. Добавление элементов идет через append, extend и
+    # extend_many, а не через само представление.
+    #
+    # Если задан max_keys, при добавлении нового ключа сверх этого
+    # количества удаляется ключ, который дольше всех не использовался. Если
+    # задан ttl, удаляются ключи, которые не использовались дольше ttl
+    # секунд по часам clock. Использованием ключа считается запись в его
+    # кольцо и получение его представления.
+
+    def __init__(self, maxlen, *, max_keys=None, ttl=None,
+                 clock=time.monotonic):
+        if maxlen <= 0:
+            raise ValueError('maxlen must be positive')
+        if max_keys is not None and max_keys <= 0:
+            raise ValueError('max_keys must be positive')
+        if ttl is not None and ttl <= 0:
+            raise ValueError('ttl must be positive')
+        self._maxlen = maxlen
+        self._max_keys = max_keys
+        self._ttl = ttl
+        self._clock = clock
+        capacities = []
+        capacity = _MIN_CAPACITY
+        while capacity < maxlen:
+            capacities.append(capacity)
+            capacity *= 2
+        capacities.append(maxlen)
+        self._capacities = capacities
+        self._slabs = [[] for _ in capacities]
+        self._starts = [[] for _ in capacities]
+        self._counts = [[] for _ in capacities]
+        self._touched = [[] for _ in capacities]
+        self._free = [[] for _ in capacities]
+        # Порядок ключей нужен только для вытеснения, а OrderedDict
+        # занимает больше памяти, чем обычный словарь.
+        self._ordered = max_keys is not None or ttl is not None
+        self._handles = collections.OrderedDict() if self._ordered else {}
+
+    @property
+    def maxlen(self):
+        return self._maxlen
+
+    @property
+    def max_keys(self):
+        return self._max_keys
+
+    @property
+    def ttl(self):
+        return self._ttl
+
+    def _locate(self, key):
+        handle = self._handles[key]
+        return handle & _CLASS_MASK, handle >> _CLASS_BITS
+
+    def _take_slot(self, cls):
+        if self._free[cls]:
+            return self._free[cls].pop()
+        slot = len(self._starts[cls])
+        self._slabs[cls].extend([None] * self._capacities[cls])
+        self._starts[cls].append(0)
+        self._counts[cls].append(0)
+        self._touched[cls].append(0)
+        return slot
+
+    def _release_slot(self, cls, slot):
+        # Ячейки участка очищаются, чтобы не удерживать ссылки на элементы.
+        capacity = self._capacities[cls]
+        base = slot * capacity
+        self._slabs[cls][base:base + capacity] = [None] * capacity
+        self._starts[cls][slot] = 0
+        self._counts[cls][slot] = 0
+        self._free[cls].append(slot)
+
+    def _read(self, cls, slot):
+        # Возвращает элементы кольца в логическом порядке не более чем
+        # двумя срезами сляба, как RingDeque._read.
+        capacity = self._capacities[cls]
+        base = slot * capacity
+        start = self._starts[cls][slot]
+        count = self._counts[cls][slot]
+        slab = self._slabs[cls]
+        first = min(count, capacity - start)
+        return (
+            slab[base + start:base + start + first]
+            + slab[base:base + count - first]
+        )
+
+    def _write(self, cls, slot, position, items):
+        capacity = self._capacities[cls]
+        base = slot * capacity
+        slab = self._slabs[cls]
+        first = min(len(items), capacity - position)
+        slab[base + position:base + position + first] = items[:first]
+        slab[base:base + len(items) - first] = items[first:]
+
+    def _reserve(self, key, amount):
+        # Возвращает класс и участок кольца key, в котором поместятся еще
+        # amount элементов, но не больше maxlen. Создает кольцо для нового
+        # ключа или переселяет кольцо в класс большей емкости и отмечает
+        # использование ключа.
+        if self._ordered:
+            now = self._clock()
+            self._expire(now)
+        handle = self._handles.get(key)
+        if handle is None:
+            if self._max_keys is not None \
+                    and len(self._handles) >= self._max_keys:
+                _, evicted = self._handles.popitem(last=False)
+                self._release_slot(
+                    evicted & _CLASS_MASK, evicted >> _CLASS_BITS
+                )
+            cls = self._class_for(amount)
+            slot = self._take_slot(cls)
+            self._handles[key] = slot << _CLASS_BITS | cls
+        else:
+            cls, slot = handle & _CLASS_MASK, handle >> _CLASS_BITS
+            if self._ordered:
+                self._handles.move_to_end(key)
+            needed = self._counts[cls][slot] + amount
+            if needed > self._capacities[cls] \
+                    and cls < len(self._capacities) - 1:
+                cls, slot = self._move(
+                    key, cls, slot, self._class_for(needed)
+                )
+        if self._ordered:
+            self._touched[cls][slot] = now
+        return cls, slot
+
+    def _class_for(self, amount):
+        return min(
+            bisect.bisect_left(self._capacities, amount),
+            len(self._capacities) - 1,
+        )
+
+    def _move(self, key, cls, slot, new_cls):
+        # Переселяет кольцо в класс new_cls одним копированием, начиная с
+        # первой ячейки нового участка.
+        items = self._read(cls, slot)
+        new_slot = self._take_slot(new_cls)
+        self._write(new_cls, new_slot, 0, items)
+        self._counts[new_cls][new_slot] = len(items)
+        self._touched[new_cls][new_slot] = self._touched[cls][slot]
+        self._release_slot(cls, slot)
+        self._handles[key] = new_slot << _CLASS_BITS | new_cls
+        return new_cls, new_slot
+
+    def _expire(self, now):
+        if self._ttl is None:
+            return
+        deadline = now - self._ttl
+        # Ключи упорядочены по времени использования, поэтому проверяются
+        # только самые старые.
+        while self._handles:
+            key, handle = next(iter(self._handles.items()))
+            cls, slot = handle & _CLASS_MASK, handle >> _CLASS_BITS
+            if self._touched[cls][slot] > deadline:
+                break
+            del self._handles[key]
+            self._release_slot(cls, slot)
+
+    def expire(self):
+        # Удаляет ключи, которые не использовались дольше ttl. Вызывается
+        # автоматически при обращениях к словарю.
+        self._expire(self._clock())
+
+    def append(self, key, item):
+        cls, slot = self._reserve(key, 1)
+        capacity = self._capacities[cls]
+        start = self._starts[cls][slot]
+        count = self._counts[cls][slot]
+        self._slabs[cls][slot * capacity + (start + count) % capacity] = item
+        # После _reserve кольцо заполнено, только если его емкость равна
+        # maxlen, и тогда новый элемент вытесняет самый старый.
+        if count < capacity:
+            self._counts[cls][slot] = count + 1
+        else:
+            self._starts[cls][slot] = (start + 1) % capacity
+
+    def extend(self, key, iterable):
+        items = list(iterable)[-self._maxlen:]
+        cls, slot = self._reserve(key, len(items))
+        capacity = self._capacities[cls]
+        start = self._starts[cls][slot]
+        count = self._counts[cls][slot]
+        self._write(cls, slot, (start + count) % capacity, items)
+        overflow = count + len(items) - capacity
+        if overflow > 0:
+            self._starts[cls][slot] = (start + overflow) % capacity
+            self._counts[cls][slot] = capacity
+        else:
+            self._counts[cls][slot] = count + len(items)
+
+    def extend_many(self, pairs):
+        # Добавляет элементы из пар (ключ, элемент). Элементы сначала
+        # группируются по ключам, после чего кольцо каждого ключа
+        # дополняется одним extend.
+        groups = {}
+        for key, item in pairs:
+            items = groups.get(key)
+            if items is None:
+                groups[key] = [item]
+            else:
+                items.append(item)
+        for key, items in groups.items():
+            self.extend(key, items)
+
+    def __getitem__(self, key):
+        if self._ordered:
+            now = self._clock()
+            self._expire(now)
+            cls, slot = self._locate(key)
+            self._handles.move_to_end(key)
+            self._touched[cls][slot] = now
+        elif key not in self._handles:
+            raise KeyError(key)
+        return RingView(self, key)
+
+    def __setitem__(self, key, iterable):
+        if key in self._handles:
+            del self[key]
+        self.extend(key, iterable)
+
+    def __delitem__(self, key):
+        handle = self._handles.pop(key)
+        self._release_slot(handle & _CLASS_MASK, handle >> _CLASS_BITS)
+
+    def __contains__(self, key):
+        if self._ttl is not None:
+            self.expire()
+        return key in self._handles
+
+    def __iter__(self):
+        if self._ttl is not None:
+            self.expire()
+        return iter(self._handles)
+
+    def __len__(self):
+        if self._ttl is not None:
+            self.expire()
+        return len(self._handles)
+
+    def clear(self):
+        self._handles.clear()
+        for lists in (
+            self._slabs, self._starts, self._counts, self._touched,
+            self._free,
+        ):
+            for values in lists:
+                values.clear()
+
+    def __repr__(self):
+        return f'RingDequeMap({len(self)} keys, maxlen={self.maxlen})'
+
+
+class RingView(typing.Sequence):
+    # Представление кольца одного ключа RingDequeMap только для чтения.
+    # Каждое обращение читает текущее содержимое кольца, а если ключ уже
+    # удален из словаря, выбрасывает KeyError.
+    __slots__ = ('_map', '_key')
+
+    def __init__(self, ring_map, key):
+        self._map = ring_map
+        self._key = key
+
+    @property
+    def maxlen(self):
+        return self._map.maxlen
+
+    def __len__(self):
+        cls, slot = self._map._locate(self._key)
+        return self._map._counts[cls][slot]
+
+    def __getitem__(self, index):
+        ring_map = self._map
+        cls, slot = ring_map._locate(self._key)
+        if isinstance(index, slice):
+            return ring_map._read(cls, slot)[index]
+        count = ring_map._counts[cls][slot]
+        if not -count <= index < count:
+            raise IndexError('deque index out of range')
+        index = index if index >= 0 else count + index
+        capacity = ring_map._capacities[cls]
+        start = ring_map._starts[cls][slot]
+        return ring_map._slabs[cls][
+            slot * capacity + (start + index) % capacity
+        ]
+
+    def __iter__(self):
+        return iter(self._map._read(*self._map._locate(self._key)))
+
+    def __repr__(self):
+        return f'RingView({list(self)}, maxlen={self.maxlen})'
@@ -0,0 +1,302 @@
+import asyncio
+import collections
+import queue
+import threading
+import time
+
+from ringdeque import RingDeque
+
+# Политики обработки переполнения очереди при добавлении элементов.
+BLOCK = 'block'
+DROP_OLDEST = 'drop_oldest'
+REJECT = 'reject'
+
+
+class BoundedRingQueue:
+    # Потокобезопасная очередь поверх RingDeque с интерфейсом, похожим на
+    # queue.Queue. Все операции, включая пакетные, выполняются под одной
+    # блокировкой, которая захватывается один раз на вызов.
+
+    def __init__(self, maxsize, *, overflow=BLOCK):
+        if maxsize <= 0:
+            raise ValueError('maxsize must be positive')
+        if overflow not in (BLOCK, DROP_OLDEST, REJECT):
+            raise ValueError(f'unknown overflow policy {overflow!r}')
+        self._ring = RingDeque(maxlen=maxsize)
+        self._overflow = overflow
+        self._mutex = threading.Lock()
+        self._not_empty = threading.Condition(self._mutex)
+        self._not_full = threading.Condition(self._mutex)
+
+    @property
+    def maxsize(self):
+        return self._ring.maxlen
+
+    @property
+    def overflow(self):
+        return self._overflow
+
+    def qsize(self):
+        with self._mutex:
+            return len(self._ring)
+
+    def empty(self):
+        with self._mutex:
+            return not self._ring
+
+    def full(self):
+        with self._mutex:
+            return len(self._ring) == self._ring.maxlen
+
+    def _wait(self, condition, predicate, block, timeout, error):
+        # Ожидает выполнения predicate на переданном условии. Вызывается под
+        # блокировкой. Если ждать нельзя или время ожидания истекло,
+        # выбрасывает error.
+        if predicate():
+            return
+        if not block:
+            raise error
+        if timeout is not None and timeout < 0:
+            raise ValueError("'timeout' must be a non-negative number")
+        if not condition.wait_for(predicate, timeout):
+            raise error
+
+    def _free(self):
+        return self._ring.maxlen - len(self._ring)
+
+    def put(self, item, block=True, timeout=None):
+        with self._not_full:
+            if len(self._ring) == self._ring.maxlen:
+                if self._overflow == REJECT:
+                    raise queue.Full
+                if self._overflow == BLOCK:
+                    self._wait(
+                        self._not_full, self._free, block, timeout, queue.Full
+                    )
+            self._ring.append(item)
+            self._not_empty.notify()
+
+    def put_nowait(self, item):
+        self.put(item, block=False)
+
+    def put_many(self, items, block=True, timeout=None):
+        # Добавляет все элементы items. При политике BLOCK элементы
+        # добавляются частями по мере освобождения места. Если время
+        # ожидания истекло, выбрасывается queue.Full, а уже добавленные
+        # элементы остаются в очереди. При политике REJECT пакет, который
+        # не помещается целиком, не добавляется вовсе.
+        items = list(items)
+        with self._not_full:
+            if self._overflow == DROP_OLDEST:
+                self._ring.extend(items)
+                self._not_empty.notify(len(items))
+                return
+            if self._overflow == REJECT:
+                if len(items) > self._free():
+                    raise queue.Full
+                self._ring.extend(items)
+                self._not_empty.notify(len(items))
+                return
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while items:
+                remaining = None
+                if deadline is not None:
+                    remaining = max(deadline - time.monotonic(), 0)
+                self._wait(
+                    self._not_full, self._free, block, remaining, queue.Full
+                )
+                amount = min(self._free(), len(items))
+                self._ring.extend(items[:amount])
+                del items[:amount]
+                self._not_empty.notify(amount)
+
+    def get(self, block=True, timeout=None):
+        with self._not_empty:
+            if not self._ring:
+                self._wait(
+                    self._not_empty, self._ring.__len__, block, timeout,
+                    queue.Empty,
+                )
+            item = self._ring.popleft()
+            self._not_full.notify()
+            return item
+
+    def get_nowait(self):
+        return self.get(block=False)
+
+    def get_many(self, n, block=True, timeout=None):
+        # Возвращает от одного до n элементов. Ожидание идет только до
+        # появления первого элемента.
+        with self._not_empty:
+            self._wait(
+                self._not_empty, self._ring.__len__, block, timeout,
+                queue.Empty,
+            )
+            return self._take(n)
+
+    def drain(self):
+        # Забирает все элементы очереди без ожидания.
+        with self._mutex:
+            return self._take(len(self._ring))
+
+    def _take(self, n):
+        batch = self._ring.popleft_many(n)
+        self._not_full.notify(len(batch))
+        return batch
+
+
+class AsyncRingDeque:
+    # Очередь для asyncio поверх RingDeque с интерфейсом, похожим на
+    # asyncio.Queue. Ожидающие корутины хранятся в очередях futures и
+    # пробуждаются при изменении очереди, без периодического опроса.
+
+    def __init__(self, maxsize, *, overflow=BLOCK):
+        if maxsize <= 0:
+            raise ValueError('maxsize must be positive')
+        if overflow not in (BLOCK, DROP_OLDEST, REJECT):
+            raise ValueError(f'unknown overflow policy {overflow!r}')
+        self._ring = RingDeque(maxlen=maxsize)
+        self._overflow = overflow
+        self._closed = False
+        self._getters = collections.deque()
+        self._putters = collections.deque()
+        # Ожидающие get_batch с таймаутом, которые ждут накопления
+        # указанного количества элементов.
+        self._batch_waiters = []
+
+    @property
+    def maxsize(self):
+        return self._ring.maxlen
+
+    @property
+    def overflow(self):
+        return self._overflow
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def qsize(self):
+        return len(self._ring)
+
+    def empty(self):
+        return not self._ring
+
+    def full(self):
+        return len(self._ring) == self._ring.maxlen
+
+    def close(self):
+        # После закрытия добавлять элементы нельзя, а получатели забирают
+        # оставшиеся элементы, после чего итерация по очереди завершается.
+        self._closed = True
+        for waiters in (self._getters, self._putters):
+            while waiters:
+                self._wakeup_next(waiters)
+        self._wake_batches(force=True)
+
+    @staticmethod
+    def _wakeup_next(waiters):
+        while waiters:
+            waiter = waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                break
+
+    def _wake_batches(self, force=False):
+        waiting = []
+        for amount, waiter in self._batch_waiters:
+            if waiter.done():
+                continue
+            if force or len(self._ring) >= amount:
+                waiter.set_result(None)
+            else:
+                waiting.append((amount, waiter))
+        self._batch_waiters = waiting
+
+    async def _wait(self, waiters):
+        waiter = asyncio.get_running_loop().create_future()
+        waiters.append(waiter)
+        try:
+            await waiter
+        except BaseException:
+            waiter.cancel()
+            try:
+                waiters.remove(waiter)
+            except ValueError:
+                pass
+            # Если пробуждение уже было получено, передаем его следующему
+            # ожидающему, чтобы оно не потерялось.
+            if waiter.done() and not waiter.cancelled():
+                self._wakeup_next(waiters)
+            raise
+
+    def _check_open(self):
+        if self._closed:
+            raise RuntimeError('put to a closed queue')
+
+    def put_nowait(self, item):
+        self._check_open()
+        if self._overflow != DROP_OLDEST and self.full():
+            raise asyncio.QueueFull
+        self._ring.append(item)
+        if self._getters:
+            self._wakeup_next(self._getters)
+        if self._batch_waiters:
+            self._wake_batches()
+
+    async def put(self, item):
+        if self._overflow == BLOCK:
+            while self.full():
+                self._check_open()
+                await self._wait(self._putters)
+        self.put_nowait(item)
+
+    def get_nowait(self):
+        if not self._ring:
+            raise asyncio.QueueEmpty
+        item = self._ring.popleft()
+        if self._putters:
+            self._wakeup_next(self._putters)
+        return item
+
+    async def get(self):
+        while not self._ring:
+            if self._closed:
+                raise asyncio.QueueEmpty
+            await self._wait(self._getters)
+        return self.get_nowait()
+
+    async def get_batch(self, max_items, timeout=None):
+        # Без таймаута ждет хотя бы одного элемента и сразу возвращает до
+        # max_items элементов. С таймаутом ждет, пока накопится max_items
+        # элементов, но не дольше timeout, и возвращает то, что есть, в том
+        # числе пустой список. Для закрытой пустой очереди возвращает
+        # пустой список.
+        if timeout is None:
+            while not self._ring and not self._closed:
+                await self._wait(self._getters)
+        elif len(self._ring) < max_items and not self._closed:
+            waiter = asyncio.get_running_loop().create_future()
+            self._batch_waiters.append((max_items, waiter))
+            try:
+                await asyncio.wait((waiter,), timeout=timeout)
+            finally:
+                if not waiter.done():
+                    waiter.cancel()
+                    self._batch_waiters.remove((max_items, waiter))
+        return self._take(max_items)
+
+    def _take(self, n):
+        batch = self._ring.popleft_many(n)
+        for _ in range(min(len(batch), len(self._putters))):
+            self._wakeup_next(self._putters)
+        return batch
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return await self.get()
+        except asyncio.QueueEmpty:
+            raise StopAsyncIteration from None
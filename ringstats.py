@@ -0,0 +1,189 @@
+import functools
+import time
+import typing
+
+# Операции, вызовы которых считаются. Методы, которых нет у класса
+# очереди, пропускаются.
+_OPERATIONS = (
+    'append', 'appendleft', 'extend', 'extendleft', 'insert', 'pop',
+    'popleft', 'popleft_many', 'pop_many', 'remove', 'clear', 'rotate',
+    'reverse', 'resize', 'evict', 'index', 'count', '__getitem__',
+    '__setitem__', '__delitem__', '__contains__',
+)
+# Операции, добавляющие элементы. Вытесненными считаются добавленные
+# элементы, на которые не выросла очередь.
+_ADDING = ('append', 'appendleft', 'insert')
+_EXTENDING = ('extend', 'extendleft')
+
+_classes = {}
+
+
+class RingStats:
+    # Счетчики одной инструментированной очереди.
+    __slots__ = (
+        'calls', 'evictions', 'shifted', 'slow_rotations', 'rotated',
+        'reallocations', 'peak', 'hook', 'sample', 'depth', 'ticks',
+    )
+
+    def __init__(self, hook=None, sample=1):
+        if sample <= 0:
+            raise ValueError('sample must be positive')
+        self.calls = {}
+        self.evictions = 0
+        self.shifted = 0
+        self.slow_rotations = 0
+        self.rotated = 0
+        self.reallocations = 0
+        self.peak = 0
+        self.hook = hook
+        self.sample = sample
+        # Глубина вложенных вызовов операций. Считаются только внешние
+        # вызовы, например remove, но не вызванный им __delitem__.
+        self.depth = 0
+        self.ticks = 0
+
+    def snapshot(self):
+        return {
+            'calls': dict(self.calls),
+            'evictions': self.evictions,
+            'shifted': self.shifted,
+            'slow_rotations': self.slow_rotations,
+            'rotated': self.rotated,
+            'reallocations': self.reallocations,
+            'peak': self.peak,
+        }
+
+
+class _Counted:
+    # Итерируемый объект без длины, который считает выданные элементы,
+    # не сохраняя их.
+    __slots__ = ('_iterable', 'consumed')
+
+    def __init__(self, iterable):
+        self._iterable = iterable
+        self.consumed = 0
+
+    def __iter__(self):
+        for item in self._iterable:
+            self.consumed += 1
+            yield item
+
+
+class _Instrumented:
+    # Переопределения внутренних методов очереди, через которые проходят
+    # сдвиги элементов и перевыделения буфера. Слотов нет, поэтому
+    # инструментированный класс совместим по устройству с исходным и
+    # очередь можно переключать между ними присваиванием __class__.
+    __slots__ = ()
+
+    def _open_gap(self, index, n):
+        self._stats.shifted += min(index, len(self) - index)
+        super()._open_gap(index, n)
+
+    def _close_gap(self, index, n):
+        self._stats.shifted += min(index, len(self) - index - n)
+        super()._close_gap(index, n)
+
+    def _reallocate(self, capacity, start=0):
+        self._stats.reallocations += 1
+        super()._reallocate(capacity, start)
+
+    def rotate(self, n=1):
+        # Медленным считается вращение незаполненного буфера, при котором
+        # элементы переносятся на другой конец очереди.
+        slow = len(self) not in (0, len(self._buffer)) and n % len(self)
+        super().rotate(n)
+        if slow:
+            self._stats.slow_rotations += 1
+            self._stats.rotated += min(slow, len(self) - slow)
+
+    def stats(self):
+        # Возвращает снимок счетчиков в виде словаря.
+        return self._stats.snapshot()
+
+    def __reduce__(self):
+        # В pickle попадает исходный класс очереди без счетчиков.
+        function, (cls, *args), *rest = super().__reduce__()
+        return (function, (type(self)._base, *args), *rest)
+
+
+def _operation(name, method):
+    adding = name in _ADDING
+    extending = name in _EXTENDING
+    evicting = name == 'evict'
+
+    @functools.wraps(method)
+    def operation(self, *args, **kwargs):
+        stats = self._stats
+        if stats.depth:
+            return method(self, *args, **kwargs)
+        counted = None
+        if extending and not isinstance(args[0], typing.Sized):
+            # Длину итератора узнаем, считая элементы по ходу extend, а
+            # не копируя их в список.
+            counted = _Counted(args[0])
+            args = (counted, *args[1:])
+        stats.calls[name] = stats.calls.get(name, 0) + 1
+        before = len(self)
+        stats.depth += 1
+        stats.ticks += 1
+        try:
+            if stats.hook is not None and stats.ticks % stats.sample == 0:
+                started = time.perf_counter()
+                result = method(self, *args, **kwargs)
+                stats.hook(name, time.perf_counter() - started)
+            else:
+                result = method(self, *args, **kwargs)
+        finally:
+            stats.depth -= 1
+        after = len(self)
+        if adding:
+            stats.evictions += before + 1 - after
+        elif extending:
+            added = len(args[0]) if counted is None else counted.consumed
+            stats.evictions += before + added - after
+        elif evicting:
+            stats.evictions += before - after
+        if after > stats.peak:
+            stats.peak = after
+        return result
+
+    return operation
+
+
+def instrumented_class(cls):
+    # Возвращает инструментированный подкласс класса очереди cls. Классы
+    # создаются один раз для каждого cls.
+    klass = _classes.get(cls)
+    if klass is None:
+        klass = type(
+            'Instrumented' + cls.__name__, (_Instrumented, cls),
+            {'__slots__': (), '_base': cls, '__module__': __name__},
+        )
+        for name in _OPERATIONS:
+            if hasattr(klass, name):
+                setattr(klass, name, _operation(name, getattr(klass, name)))
+        _classes[cls] = klass
+    return klass
+
+
+def instrument(deque, *, hook=None, sample=1):
+    # Включает счетчики очереди, заменяя ее класс инструментированным
+    # подклассом, поэтому у очередей без счетчиков операции не
+    # замедляются. Если задан hook, то для каждой sample-й операции
+    # вызывается hook(name, seconds) с именем операции и временем ее
+    # выполнения. Повторный вызов сбрасывает счетчики.
+    stats = RingStats(hook, sample)
+    stats.peak = len(deque)
+    if not isinstance(deque, _Instrumented):
+        deque.__class__ = instrumented_class(type(deque))
+    deque._stats = stats
+    return deque
+
+
+def uninstrument(deque):
+    # Выключает счетчики и возвращает очереди исходный класс.
+    if isinstance(deque, _Instrumented):
+        deque.__class__ = type(deque)._base
+        del deque._stats
+    return deque
@@ -0,0 +1,193 @@
+import queue
+from multiprocessing import shared_memory
+
+# Политики обработки переполнения: отказ в добавлении или вытеснение самых
+# старых записей, как в RingDeque.append.
+REJECT = 'reject'
+DROP_OLDEST = 'drop_oldest'
+
+# Заголовок разделяемой памяти состоит из 8-байтных счетчиков. Счетчики
+# лежат в разных строках кэша по 64 байта, чтобы процессы не мешали друг
+# другу, записывая каждый свой счетчик.
+_CACHE_LINE = 64
+_HEADER_SIZE = 4 * _CACHE_LINE
+_WRITTEN = 0
+_CLAIMED = _CACHE_LINE // 8
+_READ = 2 * _CACHE_LINE // 8
+_SLOT_SIZE = 3 * _CACHE_LINE // 8
+_SLOTS = _SLOT_SIZE + 1
+_OVERFLOW = _SLOT_SIZE + 2
+_POLICIES = (REJECT, DROP_OLDEST)
+
+
+class SharedRing:
+    # Очередь записей фиксированного размера в multiprocessing.shared_memory
+    # для одного производителя и одного потребителя без блокировок.
+    #
+    # Как и в RingDeque, состояние очереди задается началом и количеством
+    # элементов: начало - это read % slots, а количество - written - read,
+    # где written и read - монотонные счетчики записанных и прочитанных
+    # записей. Каждый счетчик изменяет только один процесс, причем уже
+    # после копирования данных, поэтому другой процесс никогда не видит
+    # счетчик, опередивший данные.
+    #
+    # При политике DROP_OLDEST производитель перезаписывает слоты, которые
+    # потребитель, возможно, еще читает. Поэтому до копирования данных он
+    # публикует счетчик claimed, равный written после добавления. Записи с
+    # номерами меньше claimed - slots перезаписаны или перезаписываются, и
+    # потребитель, сверив с claimed прочитанные записи уже после чтения,
+    # узнает, сколько из них повреждено.
+    #
+    # При создании очереди передаются slot_size и slots, для подключения к
+    # существующей очереди достаточно имени.
+
+    def __init__(self, name=None, *, slot_size=None, slots=None,
+                 overflow=REJECT):
+        if slot_size is None:
+            self._memory = shared_memory.SharedMemory(name=name)
+            header = self._memory.buf[:_HEADER_SIZE].cast('Q')
+        else:
+            if slot_size <= 0 or slots is None or slots <= 0:
+                raise ValueError('slot_size and slots must be positive')
+            if overflow not in _POLICIES:
+                raise ValueError(f'unknown overflow policy {overflow!r}')
+            self._memory = shared_memory.SharedMemory(
+                name=name, create=True,
+                size=_HEADER_SIZE + slot_size * slots,
+            )
+            header = self._memory.buf[:_HEADER_SIZE].cast('Q')
+            header[_SLOT_SIZE] = slot_size
+            header[_SLOTS] = slots
+            header[_OVERFLOW] = _POLICIES.index(overflow)
+        self._header = header
+        self._slot_size = header[_SLOT_SIZE]
+        self._slots = header[_SLOTS]
+        self._overflow = _POLICIES[header[_OVERFLOW]]
+        self._data = self._memory.buf[
+            _HEADER_SIZE:_HEADER_SIZE + self._slot_size * self._slots
+        ]
+        # Локальные копии счетчиков. Свой счетчик каждая сторона знает
+        # точно, а чужой перечитывает из памяти только тогда, когда
+        # локальной копии недостаточно.
+        self._read_seen = header[_READ]
+        self._position = header[_READ]
+        # Количество записей, полученных через peek и еще не удаленных.
+        self._peeked = 0
+
+    @property
+    def name(self):
+        return self._memory.name
+
+    @property
+    def slot_size(self):
+        return self._slot_size
+
+    @property
+    def slots(self):
+        return self._slots
+
+    @property
+    def overflow(self):
+        return self._overflow
+
+    def __len__(self):
+        read = self._header[_READ]
+        return min(self._header[_WRITTEN] - read, self._slots)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        # Все memoryview, полученные из peek, должны быть освобождены до
+        # закрытия.
+        self._header.release()
+        self._data.release()
+        self._memory.close()
+
+    def unlink(self):
+        self._memory.unlink()
+
+    def _segments(self, start, amount):
+        # Участки области данных для amount записей, начиная с записи с
+        # порядковым номером start. Как и в RingDeque, их не более двух.
+        position = start % self._slots
+        first = min(amount, self._slots - position)
+        return (
+            (position * self._slot_size, (position + first) * self._slot_size),
+            (0, (amount - first) * self._slot_size),
+        )
+
+    def push(self, records):
+        # Добавляет записи из объекта с буферным протоколом, длина которого
+        # кратна slot_size. Данные копируются прямо в разделяемую память.
+        # При политике REJECT записи, не помещающиеся целиком, не
+        # добавляются и выбрасывается queue.Full.
+        view = memoryview(records).cast('B')
+        amount, remainder = divmod(len(view), self._slot_size)
+        if remainder:
+            raise ValueError('records size must be a multiple of slot_size')
+        written = self._header[_WRITTEN]
+        if self._overflow == REJECT:
+            if written + amount - self._read_seen > self._slots:
+                self._read_seen = self._header[_READ]
+                if written + amount - self._read_seen > self._slots:
+                    raise queue.Full
+        else:
+            if amount > self._slots:
+                # Записи, которые все равно были бы вытеснены, не
+                # копируются.
+                written += amount - self._slots
+                view = view[(amount - self._slots) * self._slot_size:]
+                amount = self._slots
+            self._header[_CLAIMED] = written + amount
+        offset = 0
+        for start, stop in self._segments(written, amount):
+            self._data[start:stop] = view[offset:offset + stop - start]
+            offset += stop - start
+        self._header[_WRITTEN] = written + amount
+
+    def peek(self, n=None):
+        # Возвращает не более двух memoryview на первые n записей очереди
+        # без копирования. Записи остаются в очереди до вызова release.
+        written = self._header[_WRITTEN]
+        self._position = max(self._header[_READ], written - self._slots)
+        amount = written - self._position
+        if n is not None:
+            amount = min(amount, n)
+        self._peeked = amount
+        return tuple(
+            self._data[start:stop]
+            for start, stop in self._segments(self._position, amount)
+        )
+
+    def release(self, n):
+        # Удаляет из очереди n записей, полученных через peek, и возвращает,
+        # сколько из них осталось неповрежденными. При политике DROP_OLDEST
+        # производитель мог перезаписать первые из них, пока потребитель
+        # с ними работал.
+        if not 0 <= n <= self._peeked:
+            raise ValueError(
+                f'cannot release {n} records, {self._peeked} were peeked'
+            )
+        start = self._position
+        self._position += n
+        self._peeked -= n
+        self._header[_READ] = self._position
+        if self._overflow == REJECT:
+            return n
+        lost = self._header[_CLAIMED] - self._slots - start
+        return n - min(max(lost, 0), n)
+
+    def pop(self, n=None):
+        # Копирует и удаляет из очереди не более n записей. Возвращает
+        # bytes, длина которых кратна slot_size.
+        views = self.peek(n)
+        data = b''.join(views)
+        for view in views:
+            view.release()
+        amount = len(data) // self._slot_size
+        intact = self.release(amount)
+        return data[(amount - intact) * self._slot_size:]
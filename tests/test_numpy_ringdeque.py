@@ -0,0 +1,101 @@
+import pickle
+
+import pytest
+
+from ringdeque import NumpyRingDeque
+
+numpy = pytest.importorskip('numpy')
+
+
+class TestNumpyRingDeque:
+
+    def test_init(self):
+        deque = NumpyRingDeque([1, 2, 3, 4], maxlen=3, dtype='float64')
+        assert list(deque) == [2.0, 3.0, 4.0]
+        assert deque.dtype == numpy.float64
+        assert repr(deque) == \
+            "NumpyRingDeque([2.0, 3.0, 4.0], maxlen=3, dtype='float64')"
+
+        deque = NumpyRingDeque(numpy.arange(5), maxlen=3, dtype='int64')
+        assert list(deque) == [2, 3, 4]
+
+    def test_extend_array(self):
+        deque = NumpyRingDeque([1, 2], maxlen=4, dtype='int64')
+        deque.extend(numpy.arange(10, 13))
+        assert list(deque) == [2, 10, 11, 12]
+
+        deque.extend(numpy.arange(100))
+        assert list(deque) == [96, 97, 98, 99]
+
+        deque.extendleft(numpy.arange(3))
+        assert list(deque) == [2, 1, 0, 96]
+
+    def test_operations(self):
+        deque = NumpyRingDeque([3, 4, 5], maxlen=6, dtype='int64')
+        deque.extendleft([2, 1, 0])
+        deque.rotate(2)
+        assert list(deque) == [4, 5, 0, 1, 2, 3]
+
+        del deque[1:3]
+        deque.insert(1, 9)
+        deque.remove(2)
+        assert list(deque) == [4, 9, 1, 3]
+        assert deque.index(3) == 3
+        assert deque.pop() == 3
+        assert deque.popleft() == 4
+        assert isinstance(deque[:], NumpyRingDeque)
+        assert list(deque * 2) == [9, 1, 9, 1]
+
+    def test_as_array(self):
+        deque = NumpyRingDeque([0, 1, 2], maxlen=4, dtype='int64')
+        array = deque.as_array()
+        assert array.tolist() == [0, 1, 2]
+        assert numpy.shares_memory(array, deque._buffer)
+
+        deque.extend([3, 4])
+        array = deque.as_array()
+        assert array.tolist() == [1, 2, 3, 4]
+        assert not numpy.shares_memory(array, deque._buffer)
+
+    def test_statistics(self):
+        deque = NumpyRingDeque([5, 1, 4], maxlen=4, dtype='float64')
+        deque.extend([2, 3])
+        assert deque.sum() == 10
+        assert deque.mean() == 2.5
+        assert deque.min() == 1
+        assert deque.max() == 4
+        assert deque.percentile(50) == 2.5
+
+        deque = NumpyRingDeque(maxlen=4, dtype='float64')
+        assert deque.sum() == 0
+        for method in (deque.mean, deque.min, deque.max):
+            with pytest.raises(ValueError):
+                method()
+        with pytest.raises(ValueError):
+            deque.percentile(50)
+
+    def test_to_bytes(self):
+        deque = NumpyRingDeque([1, 2, 3], maxlen=3, dtype='>i4')
+        deque.append(4)
+        data = deque.to_bytes()
+        assert len(data) == 17 + 3 * 4
+        restored = NumpyRingDeque.from_bytes(data)
+        assert restored.as_array().tolist() == [2, 3, 4]
+        assert restored.dtype == numpy.dtype('>i4')
+        assert restored.maxlen == 3
+
+        restored = pickle.loads(pickle.dumps(deque))
+        assert isinstance(restored, NumpyRingDeque)
+        assert restored.as_array().tolist() == [2, 3, 4]
+
+        restored = NumpyRingDeque.from_bytes(
+            NumpyRingDeque([True], maxlen=2, dtype='?').to_bytes()
+        )
+        assert restored.as_array().tolist() == [True]
+        for dtype in (object, 'U3', 'M8[s]', [('a', 'i4'), ('b', 'f8')]):
+            with pytest.raises(TypeError):
+                NumpyRingDeque(maxlen=2, dtype=dtype).to_bytes()
+        data = bytearray(deque.to_bytes())
+        data[:8] = b'|O8'.ljust(8, b'\0')
+        with pytest.raises(TypeError):
+            NumpyRingDeque.from_bytes(data)
@@ -1,8 +1,13 @@
-from copy import copy
+import pickle
+import typing
+from copy import copy, deepcopy
 
 import pytest
 
-from ringdeque import RingDeque
+from ringdeque import (
+    FileSink, IndexedRingDeque, RingDeque, RingDequeSnapshot, RingDequeView,
+    RollingRingDeque, SpillingRingDeque, TimeWindowRingDeque, TypedRingDeque,
+)
 
 
 class TestRingDeque:
@@ -22,6 +27,10 @@ class TestRingDeque:
 
         with pytest.raises(ValueError):
             RingDeque(maxlen=-5)
+        with pytest.raises(TypeError):
+            RingDeque(maxlen=2.5)
+        with pytest.raises(TypeError):
+            RingDeque(maxlen=None)
 
     def test_append(self):
         deque = RingDeque([1, 2, 3], maxlen=5)
@@ -445,3 +454,857 @@ class TestRingDeque:
         deque *= n
         assert deque.maxlen == maxlen
         assert list(deque) == expected
+
+    def test_iter(self):
+        deque = RingDeque([3, 4, 5], maxlen=5)
+        deque.extendleft([2, 1])
+        deque.append(6)
+        assert list(deque) == [2, 3, 4, 5, 6]
+        assert list(reversed(deque)) == [6, 5, 4, 3, 2]
+
+        deque = RingDeque(maxlen=3)
+        assert list(deque) == []
+        assert list(reversed(deque)) == []
+
+    def test_iter_mutation(self):
+        deque = RingDeque([1, 2, 3], maxlen=5)
+        iterator = iter(deque)
+        assert next(iterator) == 1
+        deque.append(4)
+        with pytest.raises(RuntimeError):
+            next(iterator)
+
+        iterator = reversed(deque)
+        assert next(iterator) == 4
+        deque.popleft()
+        with pytest.raises(RuntimeError):
+            next(iterator)
+
+    def test_extend_overflow(self):
+        deque = RingDeque([1, 2], maxlen=4)
+        deque.extend(range(10))
+        assert list(deque) == [6, 7, 8, 9]
+
+        deque = RingDeque([1, 2], maxlen=4)
+        deque.extend(iter(range(10)))
+        assert list(deque) == [6, 7, 8, 9]
+
+        deque = RingDeque([1, 2], maxlen=4)
+        deque.extend([3, 4, 5])
+        assert list(deque) == [2, 3, 4, 5]
+
+        deque = RingDeque([1, 2], maxlen=4)
+        deque.extendleft(range(10))
+        assert list(deque) == [9, 8, 7, 6]
+
+        deque = RingDeque([1, 2], maxlen=4)
+        deque.extendleft(iter([3, 4, 5]))
+        assert list(deque) == [5, 4, 3, 1]
+
+        deque = RingDeque([1, 2, 3], maxlen=5)
+        deque.extend(deque)
+        assert list(deque) == [2, 3, 1, 2, 3]
+
+        deque = RingDeque([1, 2, 3], maxlen=5)
+        deque.extendleft(deque)
+        assert list(deque) == [3, 2, 1, 1, 2]
+
+    def test_extend_skips_prefix(self):
+        # Элементы, которые были бы вытеснены, не читаются.
+        class Items(typing.Sequence):
+            def __len__(self):
+                return 10 ** 9
+
+            def __getitem__(self, index):
+                if index < len(self) - 3:
+                    raise AssertionError(f'item {index} was read')
+                return index
+
+            def __iter__(self):
+                raise AssertionError('items were iterated')
+
+        deque = RingDeque([1], maxlen=3)
+        deque.extend(Items())
+        assert list(deque) == [10 ** 9 - 3, 10 ** 9 - 2, 10 ** 9 - 1]
+
+        source = RingDeque(range(5), maxlen=5)
+        source.extend([5, 6])
+        deque = RingDeque([1], maxlen=3)
+        deque.extend(source)
+        assert list(deque) == [4, 5, 6]
+        deque.extendleft(source)
+        assert list(deque) == [6, 5, 4]
+
+    def test_get_slice(self):
+        deque = RingDeque([2, 3, 4, 5], maxlen=6)
+        deque.extendleft([1, 0])
+        deque.append(6)
+
+        assert isinstance(deque[1:3], RingDeque)
+        assert deque[1:3].maxlen == 6
+        assert list(deque[1:3]) == [2, 3]
+        assert list(deque[-2:]) == [5, 6]
+        assert list(deque[:]) == [1, 2, 3, 4, 5, 6]
+        assert list(deque[::2]) == [1, 3, 5]
+        assert list(deque[::-1]) == [6, 5, 4, 3, 2, 1]
+        assert list(deque[-2:0:-2]) == [5, 3]
+        assert list(deque[4:2]) == []
+        assert list(deque[100:]) == []
+
+    def test_set_slice(self):
+        deque = RingDeque([2, 3, 4, 5], maxlen=8)
+        deque.extendleft([1, 0])
+
+        deque[1:3] = [10, 20]
+        assert list(deque) == [0, 10, 20, 3, 4, 5]
+
+        deque[::2] = [30, 40, 50]
+        assert list(deque) == [30, 10, 40, 3, 50, 5]
+
+        deque[1:5] = [1]
+        assert list(deque) == [30, 1, 5]
+
+        deque[-1:] = [6, 7, 8]
+        assert list(deque) == [30, 1, 6, 7, 8]
+
+        deque[:0] = [-1, -2, -3]
+        assert list(deque) == [-1, -2, -3, 30, 1, 6, 7, 8]
+
+        with pytest.raises(IndexError):
+            deque[:0] = [0]
+        assert list(deque) == [-1, -2, -3, 30, 1, 6, 7, 8]
+
+        with pytest.raises(ValueError):
+            deque[::2] = [1, 2]
+        assert list(deque) == [-1, -2, -3, 30, 1, 6, 7, 8]
+
+    def test_del_slice(self):
+        deque = RingDeque([3, 4, 5, 6, 7, 8], maxlen=10)
+        deque.extendleft([2, 1, 0])
+
+        del deque[1:3]
+        assert list(deque) == [0, 3, 4, 5, 6, 7, 8]
+
+        del deque[-3:-1]
+        assert list(deque) == [0, 3, 4, 5, 8]
+
+        del deque[::2]
+        assert list(deque) == [3, 5]
+
+        del deque[5:]
+        assert list(deque) == [3, 5]
+
+        del deque[:]
+        assert list(deque) == []
+        assert deque._buffer == [None] * 10
+
+    def test_pop_releases_references(self):
+        deque = RingDeque([1, 2, 3], maxlen=3)
+        deque.append(4)
+
+        assert deque.pop() == 4
+        assert deque.popleft() == 2
+        assert list(deque) == [3]
+        assert deque._buffer.count(None) == 2
+
+        deque.extend([5, 6])
+        deque.clear()
+        assert deque._buffer == [None, None, None]
+        deque.extend([7, 8])
+        assert list(deque) == [7, 8]
+
+    def test_index(self):
+        deque = RingDeque([2, 3, 4, 2], maxlen=6)
+        deque.extendleft([1, 0])
+
+        assert deque.index(0) == 0
+        assert deque.index(2) == 2
+        assert deque.index(2, 3) == 5
+        assert deque.index(2, -2) == 5
+        with pytest.raises(ValueError):
+            deque.index(2, 0, 2)
+        with pytest.raises(ValueError):
+            deque.index(5)
+
+    def test_remove(self):
+        deque = RingDeque([2, 3, 4, 2], maxlen=6)
+        deque.extendleft([1, 0])
+
+        deque.remove(2)
+        assert list(deque) == [0, 1, 3, 4, 2]
+
+        deque.remove(2)
+        assert list(deque) == [0, 1, 3, 4]
+
+        deque.remove(0)
+        assert list(deque) == [1, 3, 4]
+
+        with pytest.raises(ValueError):
+            deque.remove(0)
+        assert list(deque) == [1, 3, 4]
+        assert deque._buffer.count(None) == 3
+
+    def test_rotate_empty(self):
+        deque = RingDeque(maxlen=3)
+        deque.rotate(2)
+        assert list(deque) == []
+
+    def test_reverse(self):
+        deque = RingDeque([2, 3, 4], maxlen=6)
+        deque.extendleft([1, 0])
+
+        deque.reverse()
+        assert list(deque) == [4, 3, 2, 1, 0]
+
+        deque = RingDeque(maxlen=3)
+        deque.reverse()
+        assert list(deque) == []
+
+    def test_multiplication_large(self):
+        deque = RingDeque([1, 2, 3], maxlen=8) * 10 ** 12
+        assert list(deque) == [2, 3, 1, 2, 3, 1, 2, 3]
+
+        deque = RingDeque([1, 2, 3], maxlen=4)
+        alias = deque
+        deque *= 0
+        assert alias is deque
+        assert list(alias) == []
+
+    def test_pop_many(self):
+        deque = RingDeque([3, 4, 5, 6], maxlen=6)
+        deque.extendleft([2, 1])
+        assert deque.popleft_many(3) == [1, 2, 3]
+        assert deque.pop_many(2) == [6, 5]
+        assert list(deque) == [4]
+        assert deque._buffer.count(None) == 5
+
+        assert deque.popleft_many(0) == []
+        assert deque.pop_many(10) == [4]
+        assert deque.popleft_many(10) == []
+        with pytest.raises(ValueError):
+            deque.pop_many(-1)
+
+    def test_windows(self):
+        deque = RingDeque([3, 4, 5, 6], maxlen=6)
+        deque.extendleft([2, 1])
+        windows = list(deque.windows(3, 2))
+        assert [list(window) for window in windows] == [[1, 2, 3], [3, 4, 5]]
+
+        window = windows[1]
+        assert isinstance(window, RingDequeView)
+        assert len(window) == 3
+        assert window[0] == 3
+        assert window[-1] == 5
+        assert window[1:] == [4, 5]
+        assert window.tolist() == [3, 4, 5]
+        assert 4 in window
+        assert repr(window) == 'RingDequeView([3, 4, 5])'
+        with pytest.raises(IndexError):
+            window[3]
+
+        assert list(deque.windows(7)) == []
+        with pytest.raises(ValueError):
+            deque.windows(0)
+
+        windows = deque.windows(2)
+        next(windows)
+        deque.append(7)
+        with pytest.raises(RuntimeError):
+            window[0]
+        with pytest.raises(RuntimeError):
+            next(windows)
+
+    def test_snapshot(self):
+        deque = RingDeque([1, 2, 3, 4], maxlen=4)
+        deque.append(5)
+        snapshot = deque.snapshot()
+        assert isinstance(snapshot, RingDequeSnapshot)
+        buffer = deque._buffer
+
+        # Вращение заполненной очереди не пишет в буфер.
+        deque.rotate(1)
+        assert deque._buffer is buffer
+        deque.append(6)
+        deque[0] = 0
+        assert deque._buffer is not buffer
+        assert list(deque) == [0, 3, 4, 6]
+
+        assert list(snapshot) == [2, 3, 4, 5]
+        assert len(snapshot) == 4
+        assert snapshot[0] == 2
+        assert snapshot[-1] == 5
+        assert snapshot[1:3] == [3, 4]
+        assert snapshot.tolist() == [2, 3, 4, 5]
+        assert repr(snapshot) == 'RingDequeSnapshot([2, 3, 4, 5])'
+        with pytest.raises(IndexError):
+            snapshot[4]
+
+        snapshot = deque.snapshot()
+        deque.clear()
+        assert list(snapshot) == [0, 3, 4, 6]
+        assert list(deque) == []
+
+        # Итераторы, созданные до снимка, читают новый буфер очереди.
+        deque = RingDeque([1, 2, 3], maxlen=3)
+        iterator = iter(deque)
+        backward = reversed(deque)
+        assert next(iterator) == 1
+        assert next(backward) == 3
+        deque.snapshot()
+        deque[1] = 99
+        assert list(iterator) == [99, 3]
+        assert list(backward) == [99, 1]
+
+        # То же для итераторов представлений.
+        deque = RingDeque([1, 2, 3], maxlen=3)
+        view = next(deque.windows(3))
+        iterator = iter(view)
+        assert next(iterator) == 1
+        deque.snapshot()
+        deque[1] = 99
+        assert list(iterator) == [99, 3]
+        assert view[1] == 99
+
+    def test_pickle(self):
+        deque = RingDeque([1, 2, 3, 4], maxlen=4, growable=True)
+        deque.extend([5, 6])
+        deque.snapshot()
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            restored = pickle.loads(pickle.dumps(deque, protocol))
+            assert type(restored) is RingDeque
+            assert list(restored) == [3, 4, 5, 6]
+            assert restored.maxlen == 4
+            assert restored.growable
+            assert restored._start_index == 0
+            assert not restored._shared
+        assert list(deepcopy(deque)) == [3, 4, 5, 6]
+
+        # Свободные ячейки буфера не сериализуются.
+        deque = RingDeque([1], maxlen=1000)
+        deque.extend([2, 3])
+        assert len(pickle.dumps(deque)) < 100
+        deque = RingDeque(maxlen=0)
+        assert pickle.loads(pickle.dumps(deque)).maxlen == 0
+
+    def test_copy_buffer(self):
+        deque = RingDeque([1, 2, 3], maxlen=4, growable=True)
+        deque.extend([4, 5])
+        copy = deque.copy()
+        assert copy.growable
+        assert copy._buffer == deque._buffer
+        assert copy._buffer is not deque._buffer
+        copy.append(6)
+        assert list(copy) == [3, 4, 5, 6]
+        assert list(deque) == [2, 3, 4, 5]
+
+    def test_resize(self):
+        deque = RingDeque([1, 2, 3, 4], maxlen=5)
+        deque.rotate(2)
+        deque.resize(8)
+        assert deque.maxlen == 8
+        assert len(deque._buffer) == 8
+        deque.extend([5, 6, 7, 8, 9])
+        assert list(deque) == [4, 1, 2, 5, 6, 7, 8, 9]
+
+        deque.resize(3)
+        assert list(deque) == [7, 8, 9]
+        assert len(deque._buffer) == 3
+        deque.append(10)
+        assert list(deque) == [8, 9, 10]
+
+        deque.resize(0)
+        assert list(deque) == []
+        with pytest.raises(ValueError):
+            deque.resize(-1)
+        with pytest.raises(TypeError):
+            deque.resize(2.5)
+        assert deque.maxlen == 0
+
+    def test_growable(self):
+        deque = RingDeque(maxlen=100, growable=True)
+        assert deque.growable
+        assert len(deque._buffer) == 0
+
+        deque.append(1)
+        assert len(deque._buffer) == 4
+        deque.extend(range(2, 10))
+        assert len(deque._buffer) == 9
+        deque.appendleft(0)
+        assert len(deque._buffer) == 18
+        assert list(deque) == list(range(10))
+
+        deque.extend(range(10, 150))
+        assert len(deque._buffer) == 100
+        assert list(deque) == list(range(50, 150))
+
+        for _ in range(90):
+            deque.popleft()
+        assert list(deque) == list(range(140, 150))
+        assert len(deque._buffer) == 25
+        assert deque.copy().growable
+
+        deque.resize(5)
+        assert list(deque) == list(range(145, 150))
+        assert len(deque._buffer) == 5
+
+        deque.clear()
+        assert len(deque._buffer) == 0
+        deque.insert(0, 1)
+        assert list(deque) == [1]
+
+    def test_lazy_allocation(self):
+        deque = RingDeque(maxlen=100)
+        assert len(deque._buffer) == 0
+        assert not hasattr(deque, '__dict__')
+        assert list(deque) == []
+        assert deque[:] == deque
+        deque.rotate(1)
+        deque.resize(10)
+        assert len(deque._buffer) == 0
+
+        deque.appendleft(1)
+        assert len(deque._buffer) == 10
+        assert list(deque) == [1]
+
+        deque = RingDeque([1, 2, 3], maxlen=100)
+        assert list(deque) == [1, 2, 3]
+        assert len(deque._buffer) == 100
+        deque = RingDeque([1, 2, 3], maxlen=100, growable=True)
+        assert len(deque._buffer) == 4
+
+
+class TestTypedRingDeque:
+
+    def test_init(self):
+        deque = TypedRingDeque([1.5, 2.5, 3.5, 4.5], maxlen=3, typecode='d')
+        assert list(deque) == [2.5, 3.5, 4.5]
+        assert deque.typecode == 'd'
+        assert repr(deque) == \
+            "TypedRingDeque([2.5, 3.5, 4.5], maxlen=3, typecode='d')"
+
+        for typecode in ('u', 'bB', '', None):
+            with pytest.raises(ValueError):
+                TypedRingDeque(maxlen=3, typecode=typecode)
+        with pytest.raises(ValueError):
+            TypedRingDeque(maxlen=-1, typecode='d')
+
+    def test_operations(self):
+        deque = TypedRingDeque([3, 4, 5], maxlen=6, typecode='q')
+        deque.extendleft([2, 1, 0])
+        deque.rotate(2)
+        assert list(deque) == [4, 5, 0, 1, 2, 3]
+
+        del deque[1:3]
+        deque.insert(1, 9)
+        deque.remove(2)
+        assert list(deque) == [4, 9, 1, 3]
+        assert deque.pop() == 3
+        assert deque.popleft() == 4
+
+        assert isinstance(deque[:], TypedRingDeque)
+        assert isinstance(deque * 2, TypedRingDeque)
+        assert list(deque * 2) == [9, 1, 9, 1]
+        assert list(deque + RingDeque([7], maxlen=2)) == [9, 1, 7]
+
+        deque.clear()
+        assert list(deque) == []
+
+    def test_bad_item(self):
+        deque = TypedRingDeque([1, 2], maxlen=2, typecode='q')
+        with pytest.raises(TypeError):
+            deque.append('3')
+        assert list(deque) == [1, 2]
+        with pytest.raises(TypeError):
+            deque.extend(['3'])
+        assert list(deque) == [1, 2]
+
+    def test_segments(self):
+        deque = TypedRingDeque([2, 3], maxlen=4, typecode='i')
+        deque.extendleft([1, 0])
+        head, tail = deque.segments()
+        assert head.tolist() + tail.tolist() == [0, 1, 2, 3]
+        assert tail.tolist() == [2, 3]
+
+        deque = TypedRingDeque([0, 1], maxlen=4, typecode='i')
+        head, tail = deque.segments()
+        assert head.tolist() == [0, 1]
+        assert len(tail) == 0
+        assert bytes(head) == deque._buffer[:2].tobytes()
+
+    def test_segments_alive(self):
+        # Пока существуют memoryview из segments, буфер array.array нельзя
+        # менять в размере, но операции очереди должны работать.
+        deque = TypedRingDeque([1, 2, 3], maxlen=5, typecode='i')
+        head, tail = deque.segments()
+        deque.insert(0, 9)
+        assert list(deque) == [9, 1, 2, 3]
+        deque.insert(len(deque), 4)
+        del deque[0]
+        del deque[-1]
+        del deque[1]
+        assert list(deque) == [1, 3]
+        deque.clear()
+        assert list(deque) == []
+        assert len(deque) == 0
+        deque.extend([5, 6])
+        assert list(deque) == [5, 6]
+        head.release()
+        tail.release()
+
+    def test_pickle(self):
+        deque = TypedRingDeque([1, 2, 3], maxlen=3, typecode='h')
+        deque.append(4)
+        restored = pickle.loads(pickle.dumps(deque))
+        assert isinstance(restored, TypedRingDeque)
+        assert restored.typecode == 'h'
+        assert list(restored) == [2, 3, 4]
+
+    def test_to_bytes(self):
+        deque = TypedRingDeque([1.5, 2.5], maxlen=3, typecode='d')
+        deque.extendleft([0.5, -0.5])
+        data = deque.to_bytes()
+        assert len(data) == 17 + 3 * 8
+        restored = TypedRingDeque.from_bytes(data)
+        assert list(restored) == [-0.5, 0.5, 1.5]
+        assert restored.maxlen == 3
+        assert restored.typecode == 'd'
+        assert not restored.growable
+
+        deque = TypedRingDeque(maxlen=5, typecode='B', growable=True)
+        restored = TypedRingDeque.from_bytes(deque.to_bytes())
+        assert list(restored) == []
+        assert restored.growable
+
+        with pytest.raises(ValueError):
+            TypedRingDeque.from_bytes(data[:-1])
+
+
+class TestRollingRingDeque:
+
+    def test_sliding_window(self):
+        deque = RollingRingDeque([4, 1, 3], maxlen=3)
+        assert deque.sum() == 8
+        assert deque.min() == 1
+        assert deque.max() == 4
+
+        deque.append(2)
+        assert list(deque) == [1, 3, 2]
+        assert deque.sum() == 6
+        assert deque.mean() == pytest.approx(2)
+        assert deque.variance() == pytest.approx(2 / 3)
+        assert deque.min() == 1
+        assert deque.max() == 3
+
+        deque.extend([5, 0])
+        assert list(deque) == [2, 5, 0]
+        assert deque.sum() == 7
+        assert deque.min() == 0
+        assert deque.max() == 5
+
+        deque.popleft()
+        assert deque.sum() == 5
+        assert deque.variance() == pytest.approx(6.25)
+        assert deque.min() == 0
+        assert deque.max() == 5
+
+    def test_other_changes(self):
+        deque = RollingRingDeque([1, 2, 3, 4], maxlen=4)
+
+        deque.appendleft(9)
+        assert list(deque) == [9, 1, 2, 3]
+        assert deque.sum() == 15
+        assert deque.max() == 9
+
+        assert deque.pop() == 3
+        deque[0] = 0
+        assert deque.sum() == 3
+        assert deque.max() == 2
+
+        del deque[1]
+        deque.insert(0, -1)
+        assert list(deque) == [-1, 0, 2]
+        assert deque.sum() == 1
+        assert deque.min() == -1
+
+        deque[1:] = [7, 8, 9]
+        assert deque.sum() == 23
+        assert deque.max() == 9
+
+        deque.clear()
+        assert deque.sum() == 0
+        with pytest.raises(ValueError):
+            deque.mean()
+        with pytest.raises(ValueError):
+            deque.variance()
+        with pytest.raises(ValueError):
+            deque.min()
+        with pytest.raises(ValueError):
+            deque.max()
+
+    def test_pop_many(self):
+        deque = RollingRingDeque([5, 1, 3, 2, 4], maxlen=5)
+        assert deque.popleft_many(2) == [5, 1]
+        assert deque.sum() == 9
+        assert deque.min() == 2
+        assert deque.pop_many(1) == [4]
+        assert deque.max() == 3
+
+    def test_resize(self):
+        deque = RollingRingDeque([5, 1, 3, 2], maxlen=4, growable=True)
+        deque.resize(2)
+        assert list(deque) == [3, 2]
+        assert deque.sum() == 5
+        assert deque.min() == 2
+        deque.extend([4, 0])
+        assert deque.max() == 4
+
+
+class TestSpillingRingDeque:
+
+    def test_pickle(self):
+        batches = []
+        deque = SpillingRingDeque(
+            [1, 2, 3], maxlen=2, sink=batches.append, batch_size=2
+        )
+        restored = pickle.loads(pickle.dumps(deque))
+        assert list(restored) == [2, 3]
+        assert restored._batch_size == 2
+        assert list(restored.history()) == [1, 2, 3]
+
+    def test_new(self):
+        batches = []
+        deque = SpillingRingDeque(
+            [1, 2, 3], maxlen=3, sink=batches.append, batch_size=2
+        )
+        deque.append(4)
+        for result in (
+            deque.copy(), copy(deque), deque[:2], deque * 2,
+            deque + deque,
+        ):
+            assert type(result) is SpillingRingDeque
+            assert result.sink == deque.sink
+            assert result._batch_size == 2
+            assert result._pending == []
+        assert list(deque * 2) == [2, 3, 4]
+        assert batches == []
+
+        result = deque.copy()
+        result.extend([5, 6])
+        assert batches == [[2, 3]]
+        assert deque._pending == [1]
+        assert list(deque) == [2, 3, 4]
+
+    def test_batches(self):
+        batches = []
+        deque = SpillingRingDeque(
+            [1, 2, 3], maxlen=2, sink=batches.append, batch_size=2
+        )
+        assert list(deque) == [2, 3]
+        assert batches == []
+
+        deque.append(4)
+        assert batches == [[1, 2]]
+
+        deque.appendleft(0)
+        deque.extend([5, 6, 7, 8])
+        assert list(deque) == [7, 8]
+        assert batches == [[1, 2], [4, 0], [3, 5]]
+
+        deque.extendleft([9, 10, 11])
+        assert list(deque) == [11, 10]
+        assert batches == [[1, 2], [4, 0], [3, 5], [6, 8], [7, 9]]
+
+        assert deque.pop() == 10
+        deque.flush()
+        assert len(batches) == 5
+
+    def test_flush(self):
+        batches = []
+        deque = SpillingRingDeque(maxlen=1, sink=batches.append, batch_size=10)
+        deque.extend([1, 2, 3])
+        assert batches == []
+        deque.flush()
+        assert batches == [[1, 2]]
+        deque.flush()
+        assert batches == [[1, 2]]
+
+        with pytest.raises(ValueError):
+            SpillingRingDeque(maxlen=1, sink=batches.append, batch_size=0)
+
+    def test_resize(self):
+        batches = []
+        deque = SpillingRingDeque(
+            range(5), maxlen=5, sink=batches.append, batch_size=3
+        )
+        deque.resize(2)
+        assert list(deque) == [3, 4]
+        assert batches == [[0, 1, 2]]
+
+    def test_file_sink(self, tmp_path):
+        sink = FileSink(tmp_path / 'spill.bin')
+        deque = SpillingRingDeque(maxlen=3, sink=sink, batch_size=2)
+        deque.extend(range(10))
+        assert list(sink) == [0, 1, 2, 3, 4, 5]
+        assert list(deque.history()) == list(range(10))
+
+        deque.flush()
+        assert list(sink) == [0, 1, 2, 3, 4, 5, 6]
+        sink.close()
+
+        with open(tmp_path / 'spill.bin', 'ab') as file:
+            file.write(b'\x10\x00')
+        sink = FileSink(tmp_path / 'spill.bin')
+        assert list(sink) == list(range(7))
+        sink.close()
+
+
+class TestIndexedRingDeque:
+
+    def test_pickle(self):
+        deque = IndexedRingDeque(['a', 'b', 'a', 'c'], maxlen=3)
+        restored = pickle.loads(pickle.dumps(deque))
+        assert list(restored) == ['b', 'a', 'c']
+        assert restored.count('a') == 1
+        assert restored.index('c') == 2
+
+    def test_end_operations(self):
+        deque = IndexedRingDeque(['a', 'b', 'a'], maxlen=4)
+        assert 'a' in deque
+        assert 'c' not in deque
+        assert [] not in deque
+        assert deque.count('a') == 2
+        assert deque.count([]) == 0
+        assert deque.index('b') == 1
+
+        deque.extend(['c', 'b'])
+        assert list(deque) == ['b', 'a', 'c', 'b']
+        assert deque.count('a') == 1
+        assert deque.index('a') == 1
+        assert deque.index('b') == 0
+        assert deque.index('b', 1) == 3
+
+        deque.appendleft('d')
+        assert list(deque) == ['d', 'b', 'a', 'c']
+        assert deque.count('b') == 1
+        assert deque.index('c') == 3
+
+        assert deque.popleft() == 'd'
+        assert deque.pop() == 'c'
+        assert 'd' not in deque
+        assert 'c' not in deque
+        assert deque.index('a') == 1
+        with pytest.raises(ValueError):
+            deque.index('c')
+
+    def test_other_changes(self):
+        deque = IndexedRingDeque([1, 2, 3, 2], maxlen=6)
+
+        deque.rotate(1)
+        assert deque.index(3) == 3
+        deque.reverse()
+        assert list(deque) == [3, 2, 1, 2]
+        assert deque.index(1) == 2
+
+        deque[0] = 2
+        assert 3 not in deque
+        assert deque.count(2) == 3
+        del deque[2]
+        assert 1 not in deque
+        deque.insert(1, 5)
+        assert deque.index(5) == 1
+        deque.remove(2)
+        assert list(deque) == [5, 2, 2]
+        assert deque.index(2) == 1
+
+        deque[1:] = [7, 7, 7]
+        assert deque.count(7) == 3
+        assert deque.count(2) == 0
+
+        deque.clear()
+        assert 7 not in deque
+        deque.append(7)
+        assert deque.index(7) == 0
+
+    def test_pop_many(self):
+        deque = IndexedRingDeque([1, 2, 1, 3, 2], maxlen=5)
+        assert deque.popleft_many(2) == [1, 2]
+        assert deque.index(2) == 2
+        assert deque.pop_many(2) == [2, 3]
+        assert 3 not in deque
+        assert deque.count(1) == 1
+
+    def test_unhashable_items(self):
+        deque = IndexedRingDeque([1], maxlen=2)
+        with pytest.raises(TypeError):
+            deque.append([])
+        with pytest.raises(TypeError):
+            deque.extend([2, []])
+        assert list(deque) == [1]
+        assert deque.count(1) == 1
+
+
+class TestTimeWindowRingDeque:
+
+    def test_horizon(self):
+        deque = TimeWindowRingDeque([1, 2, 4, 7], maxlen=10, horizon=5)
+        assert list(deque) == [2, 4, 7]
+        deque.append(10)
+        assert list(deque) == [7, 10]
+        deque.extend([11, 11, 16])
+        assert list(deque) == [11, 11, 16]
+
+        deque.evict(19)
+        assert list(deque) == [16]
+        deque.evict(30)
+        assert list(deque) == []
+
+        with pytest.raises(ValueError):
+            TimeWindowRingDeque(maxlen=10, horizon=-1)
+
+    def test_queries(self):
+        def key(sample):
+            return sample[0]
+
+        deque = TimeWindowRingDeque(
+            [(t, str(t)) for t in range(0, 20, 2)], maxlen=8, horizon=100,
+            key=key,
+        )
+        assert deque.range(5, 10) == [(6, '6'), (8, '8')]
+        assert deque.range(10, 5) == []
+        assert deque.range(-10, 6) == [(4, '4')]
+        assert deque.since(15) == [(16, '16'), (18, '18')]
+        assert deque.since(20) == []
+        assert deque[:2] == TimeWindowRingDeque(
+            [(4, '4'), (6, '6')], maxlen=8, horizon=100, key=key
+        )
+
+    def test_order(self):
+        deque = TimeWindowRingDeque([1, 3, 5], maxlen=6, horizon=10)
+        with pytest.raises(ValueError):
+            deque.append(4)
+        with pytest.raises(ValueError):
+            deque.extend([6, 5])
+        with pytest.raises(ValueError):
+            deque.appendleft(2)
+        with pytest.raises(ValueError):
+            deque.insert(1, 4)
+        with pytest.raises(ValueError):
+            deque[1] = 0
+        with pytest.raises(TypeError):
+            deque[1:] = [3, 5]
+        with pytest.raises(TypeError):
+            deque.rotate()
+        with pytest.raises(TypeError):
+            deque.reverse()
+        with pytest.raises(TypeError):
+            deque * 2
+        with pytest.raises(TypeError):
+            2 * deque
+        with pytest.raises(TypeError):
+            deque *= 2
+        assert list(deque) == [1, 3, 5]
+
+        deque.insert(1, 2)
+        deque.extendleft([1, 0])
+        deque[2] = 2
+        assert list(deque) == [0, 1, 2, 2, 3, 5]
@@ -0,0 +1,123 @@
+import pytest
+
+from ringlog import RingLog, RingLogError
+
+
+def crash(log):
+    # Закрывает файл журнала без записи признака корректного закрытия.
+    log._map.close()
+    log._file.close()
+
+
+class TestRingLog:
+
+    def test_fixed_records(self, tmp_path):
+        path = tmp_path / 'audit.log'
+        with RingLog(path, slots=3, slot_size=2) as log:
+            assert log.slot_size == 2
+            for record in (b'aa', b'bb', b'cc', b'dd'):
+                log.append(record)
+            assert list(log) == [b'bb', b'cc', b'dd']
+            assert log[-1] == b'dd'
+            assert log.generation == 5
+
+            with pytest.raises(ValueError):
+                log.append(b'e')
+
+        with RingLog(path) as log:
+            assert list(log) == [b'bb', b'cc', b'dd']
+            assert log.popleft() == b'bb'
+            log.append(b'ee')
+            assert list(log) == [b'cc', b'dd', b'ee']
+
+        with pytest.raises(ValueError):
+            RingLog(path, slots=4, slot_size=2)
+
+    def test_variable_records(self, tmp_path):
+        path = tmp_path / 'audit.log'
+        with RingLog(path, slots=4, data_size=10) as log:
+            assert log.slot_size is None
+            log.append(b'abc')
+            log.append(b'defg')
+            log.append(b'')
+            log.append(b'hi')
+            assert list(log) == [b'abc', b'defg', b'', b'hi']
+
+            # Запись не помещается в конец области данных и вытесняет
+            # записи из ее начала.
+            log.append(b'jklm')
+            assert list(log) == [b'', b'hi', b'jklm']
+
+            log.append(b'n')
+            log.append(b'o')
+            assert len(log) == 4
+            assert list(log) == [b'hi', b'jklm', b'n', b'o']
+
+            with pytest.raises(ValueError):
+                log.append(b'x' * 11)
+
+            log.clear()
+            assert len(log) == 0
+
+    def test_recovery(self, tmp_path):
+        path = tmp_path / 'audit.log'
+        log = RingLog(path, slots=4, slot_size=3)
+        for record in (b'aaa', b'bbb', b'ccc', b'ddd', b'eee'):
+            log.append(record)
+        crash(log)
+
+        log = RingLog(path)
+        assert list(log) == [b'bbb', b'ccc', b'ddd', b'eee']
+        # Недописанная запись: данные перезаписаны частично, а ячейка и
+        # заголовок не обновлены.
+        start = log._data_offset + log.generation % log.slots * 3
+        log._map[start:start + 2] = b'ff'
+        crash(log)
+
+        log = RingLog(path)
+        assert list(log) == [b'ccc', b'ddd', b'eee']
+        log.append(b'fff')
+        assert list(log) == [b'ccc', b'ddd', b'eee', b'fff']
+        log.close()
+
+    def test_corrupted_records(self, tmp_path):
+        path = tmp_path / 'audit.log'
+        with RingLog(path, slots=4, data_size=8) as log:
+            for record in (b'ab', b'cd', b'ef'):
+                log.append(record)
+            # Поврежденная последняя запись.
+            log._map[log._data_offset + 4] ^= 0xff
+            with pytest.raises(RingLogError):
+                log[-1]
+            with pytest.raises(RingLogError):
+                log.append(b'gh')
+            assert len(log) == 3
+
+        with RingLog(path, slots=4, data_size=8) as log:
+            log.clear()
+            for record in (b'ab', b'cd', b'ef'):
+                log.append(record)
+            # Поврежденная самая старая запись, которую новая запись
+            # вытесняет.
+            log._map[log._data_offset] ^= 0xff
+            log.append(b'ghi')
+            assert list(log) == [b'ef', b'ghi']
+
+    def test_recovery_after_pop(self, tmp_path):
+        path = tmp_path / 'audit.log'
+        log = RingLog(path, slots=4, data_size=16)
+        for record in (b'a', b'bb', b'ccc'):
+            log.append(record)
+        log.popleft()
+        crash(log)
+
+        with RingLog(path) as log:
+            assert list(log) == [b'bb', b'ccc']
+
+    def test_not_a_ring_log(self, tmp_path):
+        path = tmp_path / 'other.bin'
+        path.write_bytes(b'x' * 4096)
+        with pytest.raises(RingLogError):
+            RingLog(path)
+        with pytest.raises(ValueError):
+            RingLog(tmp_path / 'new.log', slots=4)
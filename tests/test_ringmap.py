@@ -0,0 +1,105 @@
+import pytest
+
+from ringmap import RingDequeMap
+
+
+class TestRingDequeMap:
+
+    def test_init(self):
+        ring_map = RingDequeMap(10)
+        assert ring_map.maxlen == 10
+        assert ring_map.max_keys is None
+        assert ring_map.ttl is None
+        assert len(ring_map) == 0
+
+        with pytest.raises(ValueError):
+            RingDequeMap(0)
+        with pytest.raises(ValueError):
+            RingDequeMap(10, max_keys=0)
+        with pytest.raises(ValueError):
+            RingDequeMap(10, ttl=0)
+
+    def test_append_extend(self):
+        ring_map = RingDequeMap(10)
+        for item in range(3):
+            ring_map.append('a', item)
+        ring_map.extend('b', range(25))
+        assert list(ring_map['a']) == [0, 1, 2]
+        assert list(ring_map['b']) == list(range(15, 25))
+
+        # Кольцо переселяется в больший класс, когда перестает помещаться.
+        ring_map.extend('a', range(3, 12))
+        view = ring_map['a']
+        assert list(view) == list(range(2, 12))
+        assert len(view) == 10
+        assert view[0] == 2
+        assert view[-1] == 11
+        assert view[1:3] == [3, 4]
+        with pytest.raises(IndexError):
+            view[10]
+        assert repr(view) == f'RingView({list(range(2, 12))}, maxlen=10)'
+
+        ring_map.append('a', 12)
+        assert list(view) == list(range(3, 13))
+        assert 'a' in ring_map
+        assert 'c' not in ring_map
+        with pytest.raises(KeyError):
+            ring_map['c']
+
+    def test_extend_many(self):
+        ring_map = RingDequeMap(3)
+        ring_map.extend_many([('a', 1), ('b', 2), ('a', 3), ('a', 4)])
+        ring_map.extend_many([('a', 5), ('c', 6)])
+        assert {key: list(view) for key, view in ring_map.items()} == {
+            'a': [3, 4, 5], 'b': [2], 'c': [6],
+        }
+
+    def test_set_delete(self):
+        ring_map = RingDequeMap(4)
+        ring_map['a'] = [1, 2, 3, 4, 5]
+        view = ring_map['a']
+        assert list(view) == [2, 3, 4, 5]
+        ring_map['a'] = [6]
+        assert list(view) == [6]
+
+        del ring_map['a']
+        with pytest.raises(KeyError):
+            len(view)
+        with pytest.raises(KeyError):
+            del ring_map['a']
+
+        # Освобожденный участок сляба используется следующим ключом.
+        ring_map.append('b', 7)
+        assert sum(len(slab) for slab in ring_map._slabs) == 4
+        ring_map.clear()
+        assert len(ring_map) == 0
+        assert ring_map.get('b') is None
+
+    def test_lru(self):
+        ring_map = RingDequeMap(4, max_keys=2)
+        ring_map.append('a', 1)
+        ring_map.append('b', 2)
+        ring_map['a']
+        ring_map.append('c', 3)
+        assert list(ring_map) == ['a', 'c']
+
+        ring_map.append('a', 4)
+        ring_map.append('d', 5)
+        assert list(ring_map) == ['a', 'd']
+        assert list(ring_map['a']) == [1, 4]
+
+    def test_ttl(self):
+        now = [0]
+        ring_map = RingDequeMap(4, ttl=10, clock=lambda: now[0])
+        ring_map.append('a', 1)
+        now[0] = 5
+        ring_map.append('b', 2)
+        now[0] = 12
+        assert list(ring_map) == ['b']
+
+        ring_map.append('b', 3)
+        now[0] = 20
+        assert list(ring_map['b']) == [2, 3]
+        now[0] = 30
+        ring_map.expire()
+        assert len(ring_map) == 0
@@ -0,0 +1,179 @@
+import asyncio
+import queue
+import threading
+
+import pytest
+
+from ringqueue import (
+    BLOCK, DROP_OLDEST, REJECT, AsyncRingDeque, BoundedRingQueue,
+)
+
+
+class TestBoundedRingQueue:
+
+    def test_init(self):
+        ring_queue = BoundedRingQueue(3)
+        assert ring_queue.maxsize == 3
+        assert ring_queue.overflow == BLOCK
+        assert ring_queue.empty()
+
+        with pytest.raises(ValueError):
+            BoundedRingQueue(0)
+        with pytest.raises(ValueError):
+            BoundedRingQueue(3, overflow='grow')
+
+    def test_put_get(self):
+        ring_queue = BoundedRingQueue(2)
+        ring_queue.put(1)
+        ring_queue.put_nowait(2)
+        assert ring_queue.full()
+        assert ring_queue.qsize() == 2
+
+        with pytest.raises(queue.Full):
+            ring_queue.put_nowait(3)
+        with pytest.raises(queue.Full):
+            ring_queue.put(3, timeout=0.01)
+
+        assert ring_queue.get() == 1
+        assert ring_queue.get_nowait() == 2
+        with pytest.raises(queue.Empty):
+            ring_queue.get_nowait()
+        with pytest.raises(queue.Empty):
+            ring_queue.get(timeout=0.01)
+
+    def test_overflow(self):
+        ring_queue = BoundedRingQueue(2, overflow=DROP_OLDEST)
+        ring_queue.put_many([1, 2, 3])
+        ring_queue.put(4)
+        assert ring_queue.drain() == [3, 4]
+
+        ring_queue = BoundedRingQueue(2, overflow=REJECT)
+        ring_queue.put(1)
+        with pytest.raises(queue.Full):
+            ring_queue.put_many([2, 3])
+        ring_queue.put(2)
+        with pytest.raises(queue.Full):
+            ring_queue.put(3)
+        assert ring_queue.drain() == [1, 2]
+
+    def test_batches(self):
+        ring_queue = BoundedRingQueue(5)
+        ring_queue.put_many([1, 2, 3, 4])
+        assert ring_queue.get_many(3) == [1, 2, 3]
+        assert ring_queue.get_many(3) == [4]
+        assert ring_queue.drain() == []
+        with pytest.raises(queue.Empty):
+            ring_queue.get_many(3, block=False)
+
+    def test_blocking(self):
+        ring_queue = BoundedRingQueue(3)
+        received = []
+
+        def consume():
+            while len(received) < 100:
+                received.extend(ring_queue.get_many(7, timeout=5))
+
+        consumer = threading.Thread(target=consume)
+        consumer.start()
+        ring_queue.put_many(range(50), timeout=5)
+        for item in range(50, 100):
+            ring_queue.put(item, timeout=5)
+        consumer.join(5)
+        assert received == list(range(100))
+
+
+class TestAsyncRingDeque:
+
+    def test_put_get(self):
+        async def scenario():
+            ring_queue = AsyncRingDeque(2)
+            await ring_queue.put(1)
+            ring_queue.put_nowait(2)
+            assert ring_queue.full()
+            with pytest.raises(asyncio.QueueFull):
+                ring_queue.put_nowait(3)
+
+            assert await ring_queue.get() == 1
+            assert ring_queue.get_nowait() == 2
+            with pytest.raises(asyncio.QueueEmpty):
+                ring_queue.get_nowait()
+
+        asyncio.run(scenario())
+
+    def test_overflow(self):
+        async def scenario():
+            ring_queue = AsyncRingDeque(2, overflow=DROP_OLDEST)
+            for item in range(5):
+                await ring_queue.put(item)
+            assert await ring_queue.get_batch(5) == [3, 4]
+
+            ring_queue = AsyncRingDeque(1, overflow=REJECT)
+            await ring_queue.put(1)
+            with pytest.raises(asyncio.QueueFull):
+                await ring_queue.put(2)
+
+        asyncio.run(scenario())
+
+    def test_waiters(self):
+        async def scenario():
+            ring_queue = AsyncRingDeque(2)
+            getter = asyncio.create_task(ring_queue.get())
+            await asyncio.sleep(0)
+            assert not getter.done()
+            ring_queue.put_nowait(1)
+            assert await getter == 1
+
+            await ring_queue.put(2)
+            await ring_queue.put(3)
+            putter = asyncio.create_task(ring_queue.put(4))
+            await asyncio.sleep(0)
+            assert not putter.done()
+            assert await ring_queue.get() == 2
+            await putter
+            assert await ring_queue.get_batch(5) == [3, 4]
+
+            getter = asyncio.create_task(ring_queue.get())
+            await asyncio.sleep(0)
+            getter.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await getter
+            ring_queue.put_nowait(5)
+            assert await ring_queue.get() == 5
+
+        asyncio.run(scenario())
+
+    def test_get_batch_timeout(self):
+        async def scenario():
+            ring_queue = AsyncRingDeque(10)
+            assert await ring_queue.get_batch(3, timeout=0.01) == []
+
+            ring_queue.put_nowait(1)
+            assert await ring_queue.get_batch(3, timeout=0.01) == [1]
+
+            batch = asyncio.create_task(ring_queue.get_batch(3, timeout=5))
+            for item in range(4):
+                await asyncio.sleep(0)
+                ring_queue.put_nowait(item)
+            assert await batch == [0, 1, 2]
+            assert ring_queue.get_nowait() == 3
+
+        asyncio.run(scenario())
+
+    def test_async_iteration(self):
+        async def scenario():
+            ring_queue = AsyncRingDeque(3)
+
+            async def produce():
+                for item in range(10):
+                    await ring_queue.put(item)
+                ring_queue.close()
+
+            producer = asyncio.create_task(produce())
+            received = [item async for item in ring_queue]
+            await producer
+            assert received == list(range(10))
+            with pytest.raises(RuntimeError):
+                ring_queue.put_nowait(1)
+            assert await ring_queue.get_batch(3) == []
+
+        asyncio.run(scenario())
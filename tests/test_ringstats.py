@@ -0,0 +1,101 @@
+import pickle
+
+import pytest
+
+from ringdeque import RingDeque, TimeWindowRingDeque, TypedRingDeque
+from ringstats import instrument, instrumented_class, uninstrument
+
+
+class TestInstrument:
+
+    def test_class_swap(self):
+        deque = RingDeque([1, 2], maxlen=3)
+        assert instrument(deque) is deque
+        assert type(deque) is instrumented_class(RingDeque)
+        assert isinstance(deque, RingDeque)
+        assert type(deque).__name__ == 'InstrumentedRingDeque'
+
+        deque = TypedRingDeque(maxlen=3, typecode='q')
+        instrument(deque)
+        assert isinstance(deque, TypedRingDeque)
+        assert type(deque) is instrumented_class(TypedRingDeque)
+
+        assert uninstrument(deque) is deque
+        assert type(deque) is TypedRingDeque
+        deque.append(1)
+        assert list(deque) == [1]
+        with pytest.raises(AttributeError):
+            deque.stats()
+
+    def test_counters(self):
+        deque = instrument(RingDeque([1, 2, 3], maxlen=4))
+        deque.append(4)
+        deque.append(5)
+        deque.extend(iter([6, 7]))
+        assert deque.stats()['evictions'] == 3
+        deque.extendleft(item for item in range(1000))
+        assert list(deque) == [999, 998, 997, 996]
+        assert deque.stats()['evictions'] == 1003
+        deque.extend(iter([4, 5, 6, 7]))
+        assert deque.stats()['peak'] == 4
+
+        deque.pop()
+        deque.insert(1, 9)
+        assert list(deque) == [4, 9, 5, 6]
+        del deque[2]
+        deque.remove(4)
+        stats = deque.stats()
+        assert stats['shifted'] == 2
+        # Вызванные из remove index и __delitem__ не считаются.
+        assert stats['calls'] == {
+            'append': 2, 'extend': 2, 'extendleft': 1, 'pop': 1,
+            'insert': 1, '__delitem__': 1, 'remove': 1,
+        }
+
+    def test_rotations(self):
+        deque = instrument(RingDeque([1, 2, 3, 4], maxlen=4))
+        deque.rotate(1)
+        assert deque.stats()['slow_rotations'] == 0
+
+        deque.pop()
+        deque.rotate(2)
+        deque.rotate(3)
+        stats = deque.stats()
+        assert stats['slow_rotations'] == 1
+        assert stats['rotated'] == 1
+
+    def test_evict_and_reallocations(self):
+        deque = instrument(
+            TimeWindowRingDeque([1, 2, 3], maxlen=8, horizon=2, growable=True)
+        )
+        deque.extend([4, 5])
+        assert deque.stats()['evictions'] == 2
+        deque.evict(10)
+        stats = deque.stats()
+        assert stats['evictions'] == 5
+        assert stats['reallocations'] == 2
+        assert stats['peak'] == 3
+
+    def test_hook(self):
+        calls = []
+        deque = RingDeque(maxlen=3)
+        instrument(deque, hook=lambda *args: calls.append(args), sample=2)
+        for item in range(5):
+            deque.append(item)
+        assert [name for name, _ in calls] == ['append', 'append']
+        assert all(seconds >= 0 for _, seconds in calls)
+
+        with pytest.raises(ValueError):
+            instrument(deque, sample=0)
+
+        # Повторный вызов сбрасывает счетчики.
+        instrument(deque)
+        assert deque.stats()['calls'] == {}
+        assert deque.stats()['peak'] == 3
+
+    def test_pickle(self):
+        deque = instrument(RingDeque([1, 2], maxlen=3))
+        restored = pickle.loads(pickle.dumps(deque))
+        assert type(restored) is RingDeque
+        assert list(restored) == [1, 2]
+        assert type(deque.copy()) is RingDeque
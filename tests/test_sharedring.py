@@ -0,0 +1,145 @@
+import multiprocessing
+import queue
+
+import pytest
+
+from sharedring import (
+    _CLAIMED, _WRITTEN, DROP_OLDEST, REJECT, SharedRing,
+)
+
+
+def records(*numbers):
+    return b''.join(number.to_bytes(4, 'little') for number in numbers)
+
+
+def produce(name, amount):
+    with SharedRing(name) as ring:
+        for number in range(amount):
+            while True:
+                try:
+                    ring.push(records(number))
+                except queue.Full:
+                    continue
+                break
+
+
+class TestSharedRing:
+
+    @pytest.fixture
+    def ring(self):
+        ring = SharedRing(slot_size=4, slots=4)
+        yield ring
+        ring.close()
+        ring.unlink()
+
+    def test_init(self, ring):
+        with SharedRing(ring.name) as attached:
+            assert attached.slot_size == 4
+            assert attached.slots == 4
+            assert attached.overflow == REJECT
+            assert len(attached) == 0
+
+        with pytest.raises(ValueError):
+            SharedRing(slot_size=0, slots=4)
+        with pytest.raises(ValueError):
+            SharedRing(slot_size=4, slots=4, overflow='grow')
+
+    def test_push_pop(self, ring):
+        with SharedRing(ring.name) as consumer:
+            ring.push(records(1, 2, 3))
+            assert len(consumer) == 3
+            assert consumer.pop(2) == records(1, 2)
+
+            ring.push(records(4, 5, 6))
+            with pytest.raises(queue.Full):
+                ring.push(records(7))
+            assert len(ring) == 4
+            assert consumer.pop() == records(3, 4, 5, 6)
+            assert consumer.pop() == b''
+
+            with pytest.raises(ValueError):
+                ring.push(b'123')
+
+    def test_peek_release(self, ring):
+        ring.push(records(1, 2, 3))
+        ring.pop(2)
+        ring.push(records(4, 5, 6))
+
+        head, tail = ring.peek()
+        assert bytes(head) + bytes(tail) == records(3, 4, 5, 6)
+        assert bytes(tail) == records(5, 6)
+        head.release()
+        tail.release()
+        assert ring.release(3) == 3
+        assert ring.pop() == records(6)
+
+    def test_release_checks_peeked(self, ring):
+        with pytest.raises(ValueError):
+            ring.release(3)
+        ring.push(records(1, 2, 3))
+        views = ring.peek(2)
+        for view in views:
+            view.release()
+        with pytest.raises(ValueError):
+            ring.release(-1)
+        with pytest.raises(ValueError):
+            ring.release(3)
+        assert ring.release(1) == 1
+        with pytest.raises(ValueError):
+            ring.release(2)
+        assert ring.release(1) == 1
+        assert len(ring) == 1
+        ring.push(records(4))
+        assert ring.pop() == records(3, 4)
+
+    def test_drop_oldest(self):
+        with SharedRing(slot_size=4, slots=3, overflow=DROP_OLDEST) as ring:
+            ring.push(records(1, 2))
+            ring.push(records(3, 4))
+            assert len(ring) == 3
+            assert ring.pop(1) == records(2)
+
+            ring.push(records(*range(10, 20)))
+            assert ring.pop() == records(17, 18, 19)
+
+            ring.push(records(20, 21, 22))
+            views = ring.peek()
+            ring.push(records(23, 24))
+            assert b''.join(views) == records(23, 24, 22)
+            for view in views:
+                view.release()
+            assert ring.release(3) == 1
+            assert ring.pop() == records(23, 24)
+            ring.unlink()
+
+    def test_drop_oldest_torn(self):
+        with SharedRing(slot_size=4, slots=3, overflow=DROP_OLDEST) as ring:
+            ring.push(b'AAAABBBBCCCC')
+            views = ring.peek()
+            # Производитель в середине push: счетчик claimed уже
+            # опубликован, а в слот 0 скопирована только часть записи.
+            ring._header[_CLAIMED] += 1
+            ring._data[:2] = b'DD'
+            assert b''.join(views) == b'DDAABBBBCCCC'
+            for view in views:
+                view.release()
+            assert ring.release(3) == 2
+
+            ring._data[2:4] = b'DD'
+            ring._header[_WRITTEN] += 1
+            assert ring.pop() == b'DDDD'
+            ring.unlink()
+
+    @pytest.mark.skipif(
+        'fork' not in multiprocessing.get_all_start_methods(),
+        reason='requires the fork start method',
+    )
+    def test_processes(self, ring):
+        context = multiprocessing.get_context('fork')
+        producer = context.Process(target=produce, args=(ring.name, 1000))
+        producer.start()
+        received = b''
+        while len(received) < 4000:
+            received += ring.pop()
+        producer.join()
+        assert received == records(*range(1000))